@@ -0,0 +1,97 @@
+import time
+from collections import deque
+
+CLOSED = "closed" # normal, everything goes through
+OPEN = "open" # failing fast, nothing goes through
+HALF_OPEN = "half-open" # one trial request decides which way to go
+
+WINDOW = 20 # recent calls the failure ratio is taken over
+MIN_CALLS = 5 # don't judge on fewer calls than this
+FAILURE_RATIO = 0.5
+SLOW_CALL = 5 # seconds, a call slower than this counts as failed
+OPEN_FOR = 30 # seconds to fail fast before letting a trial request through
+PROBE_INTERVAL = 15
+
+class CircuitBreaker:
+    def __init__(self, name, probe=None):
+        self.name = name
+        self.probe = probe # async fn making one cheap request, used for recovery checks
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=WINDOW)
+        self.opened_at = 0.0
+        self.trial = False
+        self.trips = 0
+
+    @property
+    def is_open(self):
+        # True while callers should get the "service degraded" answer
+        return self.state != CLOSED
+
+    def allow(self):
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < OPEN_FOR:
+                return False
+            self.state = HALF_OPEN
+            self.trial = False
+        if self.trial:
+            return False
+        self.trial = True
+        return True
+
+    def record(self, ok, duration=0.0):
+        ok = ok and duration < SLOW_CALL
+        if self.state == HALF_OPEN:
+            self.trial = False
+            if ok:
+                self._close()
+            else:
+                self._open()
+            return
+        if self.state == OPEN:
+            return # a call that started before we opened
+        self.outcomes.append(ok)
+        failed = self.outcomes.count(False)
+        if len(self.outcomes) >= MIN_CALLS and failed / len(self.outcomes) >= FAILURE_RATIO:
+            self._open()
+
+    def release(self):
+        # The call never finished (cancelled), so it says nothing either way
+        if self.state == HALF_OPEN:
+            self.trial = False
+
+    def _open(self):
+        if self.state != OPEN:
+            self.trips += 1
+            print(f"{self.name} circuit opened")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def _close(self):
+        print(f"{self.name} circuit closed")
+        self.state = CLOSED
+        self.outcomes.clear()
+
+    @property
+    def probe_due(self):
+        return self.state == OPEN and time.monotonic() - self.opened_at >= OPEN_FOR or self.state == HALF_OPEN and not self.trial
+
+_breakers = []
+
+def register(breaker):
+    _breakers.append(breaker)
+    return breaker
+
+def all_breakers():
+    return list(_breakers)
+
+async def probe_job():
+    # Nobody has to be the unlucky first user after an outage; the probe
+    # makes the trial request and closes the circuit if it succeeds
+    for breaker in _breakers:
+        if breaker.probe is not None and breaker.probe_due:
+            try:
+                await breaker.probe()
+            except Exception as e:
+                print(f"{breaker.name} probe failed:", e)
@@ -0,0 +1,51 @@
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+class TTLCache:
+    # Bounded LRU cache where every entry also expires after its own TTL.
+    # Negative entries are plain None values stored with a shorter TTL.
+    def __init__(self, maxsize, ttl, negative_ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl if negative_ttl is not None else ttl
+        self._data = OrderedDict()  # key -> (value, stored_at, expires_at)
+
+    def get(self, key, default=MISSING, max_age=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, stored_at, expires_at = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            del self._data[key]
+            return default
+        if max_age is not None and now - stored_at > max_age:
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        now = time.monotonic()
+        if ttl is None:
+            ttl = self.ttl if value is not None else self.negative_ttl
+        self._data[key] = (value, now, now + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def set_negative(self, key, ttl=None):
+        self.set(key, None, ttl if ttl is not None else self.negative_ttl)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key) is not MISSING
@@ -1,71 +1,63 @@
-import os
-import requests
+import asyncio
 import discord
+import mojang
+import config
+import hypixel
+import queue_history
+import jobs
+import startup
+import verification
+import breaker
+import deadline
 from datetime import datetime
 from discord import app_commands
-from dotenv import load_dotenv
-import json
 from typing import Literal, Optional
 import re
 
-load_dotenv()
-HYPIXEL_API_KEY = os.getenv("HYPIXEL_API_KEY")
-SETTINGS_FILE = "values.json"
 
 def update_ppy_setting(setting_key: str, value):
     try:
-        with open(SETTINGS_FILE, "r") as f:
-            data = json.load(f)
-        
-        if setting_key not in data["servers"]["PPY_COMMUNITY"]:
-            return False, f"Invalid setting key: {setting_key}"
-
-        data["servers"]["PPY_COMMUNITY"][setting_key] = value
-
-        with open(SETTINGS_FILE, "w") as f:
-            json.dump(data, f, indent=2)
-
+        config.update_setting("PPY_COMMUNITY", setting_key, value)
         return True, f"Updated `{setting_key}` to `{value}` for the PPY Community server."
+    except KeyError:
+        return False, f"Invalid setting key: {setting_key}"
     except Exception as e:
         return False, f"Error updating settings: {e}"
 
 def update_arcade_setting(setting_key: str, value):
     try:
-        with open(SETTINGS_FILE, "r") as f:
-            data = json.load(f)
-        
-        if setting_key not in data["servers"]["ARCADE_COMMUNITY"]:
-            return False, f"Invalid setting key: {setting_key}"
-
-        data["servers"]["ARCADE_COMMUNITY"][setting_key] = value
-
-        with open(SETTINGS_FILE, "w") as f:
-            json.dump(data, f, indent=2)
-
+        config.update_setting("ARCADE_COMMUNITY", setting_key, value)
         return True, f"Updated `{setting_key}` to `{value}` for ARCADE server."
+    except KeyError:
+        return False, f"Invalid setting key: {setting_key}"
     except Exception as e:
         return False, f"Error updating settings: {e}"
 
+# A MojangUnavailable (timeout, open circuit) is answered with this
+# instead of pretending the name doesn't exist
+MOJANG_DEGRADED = "The Mojang API is having problems right now, so I can't look up usernames. Try again in a few minutes."
+
 async def fetch_uuid(username: str):
-    try:
-        res = requests.get(f"https://api.mojang.com/users/profiles/minecraft/{username}")
-        if res.status_code == 200:
-            return res.json().get("id")
-    except Exception as e:
-        print("error fetching uuid:", e)
-    return None
+    return await mojang.get_uuid(username)
 
-def get_pixel_party_stats(uuid):
-    url = f'https://api.hypixel.net/player?key={HYPIXEL_API_KEY}&uuid={uuid}'
+async def get_profile(username: str):
+    return await mojang.get_profile(username)
+
+async def get_pixel_party_stats(uuid):
     try:
-        res = requests.get(url)
-        data = res.json()
-        if data.get('player') and data['player'].get('stats') and data['player']['stats'].get('Arcade'):
-            return data['player']['stats']['Arcade'].get('pixel_party', {})
-        else:
-            return {"error": "pixel_party stats not found"}
+        snapshot = await hypixel.get_snapshot(uuid)
     except Exception as e:
-        return {"error": f"api error: {e}"}
+        # Out of time or Hypixel is down: last known stats beat an error
+        snapshot = hypixel.last_known_snapshot(uuid)
+        if snapshot is None or snapshot.pixel_party is None:
+            return {"error": f"api error: {e}"}
+        return dict(snapshot.pixel_party, stale=True)
+    if snapshot.pixel_party is not None:
+        return snapshot.pixel_party
+    else:
+        return {"error": "pixel_party stats not found"}
+
+STALE_NOTE = " • Hypixel didn't answer in time, showing last known stats"
 
 def format_percentage(part, whole):
     return round((part / whole) * 100, 2) if whole else 0
@@ -81,13 +73,18 @@ def format_per_game(value, games):
 @app_commands.describe(username="Minecraft username")
 async def stats(interaction: discord.Interaction, username: str):
     await interaction.response.defer()
+    deadline.start()
 
-    uuid = await fetch_uuid(username)
+    try:
+        uuid = await fetch_uuid(username)
+    except mojang.MojangUnavailable:
+        await interaction.followup.send(MOJANG_DEGRADED)
+        return
     if not uuid:
         await interaction.followup.send(f"Couldn't find UUID for `{username}`.")
         return
 
-    stats = get_pixel_party_stats(uuid)
+    stats = await get_pixel_party_stats(uuid)
     if "error" in stats:
         await interaction.followup.send(f"Error: {stats['error']}")
         return
@@ -171,7 +168,7 @@ async def stats(interaction: discord.Interaction, username: str):
         inline=True
     )
 
-    embed.set_footer(text="Made by Dopa and Rawad")
+    embed.set_footer(text="Made by Dopa and Rawad" + (STALE_NOTE if stats.get("stale") else ""))
 
     await interaction.followup.send(embed=embed)
 
@@ -180,15 +177,18 @@ async def stats(interaction: discord.Interaction, username: str):
 @app_commands.describe(player1="Minecraft username of the first player", player2="Minecraft username of the second player")
 async def compare(interaction: discord.Interaction, player1: str, player2: str):
     await interaction.response.defer()
+    deadline.start()
 
     def error_embed(title: str, msg: str):
         return discord.Embed(title=title, description=msg, color=discord.Color.purple())
 
     try:
-        res1 = requests.get(f"https://api.mojang.com/users/profiles/minecraft/{player1}")
-        res2 = requests.get(f"https://api.mojang.com/users/profiles/minecraft/{player2}")
+        profile1, profile2 = await asyncio.gather(
+            get_profile(player1),
+            get_profile(player2)
+        )
 
-        if res1.status_code != 200 or res2.status_code != 200:
+        if not profile1 or not profile2:
             embed = error_embed(
                 "Invalid Username",
                 "Couldn't find one or both Minecraft usernames. Please double-check the spelling."
@@ -196,21 +196,26 @@ async def compare(interaction: discord.Interaction, player1: str, player2: str):
             await interaction.followup.send(embed=embed)
             return
 
-        uuid1 = res1.json().get("id")
-        uuid2 = res2.json().get("id")
-        name1 = res1.json().get("name")
-        name2 = res2.json().get("name")
+        uuid1, name1 = profile1
+        uuid2, name2 = profile2
 
-        stats1 = get_pixel_party_stats(uuid1)
-        stats2 = get_pixel_party_stats(uuid2)
+        stats1, stats2 = await asyncio.gather(
+            get_pixel_party_stats(uuid1),
+            get_pixel_party_stats(uuid2)
+        )
 
-        if "error" in stats1 or "error" in stats2:
+        if "error" in stats1 and "error" in stats2:
             embed = error_embed(
                 "Failed to Fetch Stats",
-                "One of the usernames is currently on cooldown due to Hypixel API limits. Please wait a few minutes before trying again." # Most likely rate limit, could be anything though
+                "Hypixel didn't return stats for either player in time. Please wait a few minutes before trying again."
             )
             await interaction.followup.send(embed=embed)
             return
+        # If only one side came back, show it and mark the other unavailable
+        if "error" in stats1:
+            stats1 = None
+        if "error" in stats2:
+            stats2 = None
 
         def extract(stats, mode="all"):
             if mode == "hyper":
@@ -258,28 +263,27 @@ async def compare(interaction: discord.Interaction, player1: str, player2: str):
                 ("Powerups", 0),
                 ("PPG", 2)
             ]
-            out1 = []
-            out2 = []
-            for i, (label, d) in enumerate(labels):
-                val1 = s1[i]
-                val2 = s2[i]
-                is_pct = label == "Winrate"
-                suffix = "%" if is_pct else ""
-                if is_pct:
-                    out1.append(f"**{label}**: {sep(val1, d)}% {with_diff(val1, val2, d, '%')}")
-                    out2.append(f"**{label}**: {sep(val2, d)}% {with_diff(val2, val1, d, '%')}")
-                else:
-                    out1.append(f"**{label}**: {sep(val1, d)} {with_diff(val1, val2, d)}")
-                    out2.append(f"**{label}**: {sep(val2, d)} {with_diff(val2, val1, d)}")
-            return "\n".join(out1), "\n".join(out2)
-
-        s1_overall = extract(stats1, "all")
-        s2_overall = extract(stats2, "all")
-        s1_hyper = extract(stats1, "hyper")
-        s2_hyper = extract(stats2, "hyper")
+            def lines(s, other):
+                if s is None:
+                    return "Stats unavailable right now"
+                out = []
+                for i, (label, d) in enumerate(labels):
+                    suffix = "%" if label == "Winrate" else ""
+                    # no diff to show when the other side is missing
+                    diff = "" if other is None else " " + with_diff(s[i], other[i], d, suffix)
+                    out.append(f"**{label}**: {sep(s[i], d)}{suffix}{diff}")
+                return "\n".join(out)
+            return lines(s1, s2), lines(s2, s1)
+
+        s1_overall = extract(stats1, "all") if stats1 else None
+        s2_overall = extract(stats2, "all") if stats2 else None
+        s1_hyper = extract(stats1, "hyper") if stats1 else None
+        s2_hyper = extract(stats2, "hyper") if stats2 else None
 
         # Normal = overall - hyper (we only get overall and hyper from the API so we need to calculate normal manually)
         def fix_normal(overall, hyper):
+            if overall is None:
+                return None
             g = overall[0] - hyper[0]
             w = overall[1] - hyper[1]
             l = g - w
@@ -314,10 +318,15 @@ async def compare(interaction: discord.Interaction, player1: str, player2: str):
         embed.add_field(name=f"**{name1} — Normal**", value=n1, inline=True)
         embed.add_field(name=f"**{name2} — Normal**", value=n2, inline=True)
 
-        embed.set_footer(text="Made by Dopa & Rawad")
+        stale = [name for name, s in ((name1, stats1), (name2, stats2)) if s and s.get("stale")]
+        embed.set_footer(text="Made by Dopa & Rawad" + (f"{STALE_NOTE} ({', '.join(stale)})" if stale else ""))
 
         await interaction.followup.send(embed=embed)
 
+    except mojang.MojangUnavailable:
+        embed = error_embed("Service Degraded", MOJANG_DEGRADED)
+        await interaction.followup.send(embed=embed)
+
     except Exception as e:
         embed = error_embed(
             "Unknown Error",
@@ -325,6 +334,87 @@ async def compare(interaction: discord.Interaction, player1: str, player2: str):
         )
         await interaction.followup.send(embed=embed)
 
+HISTORY_PERIODS = {"1h": 3600, "6h": 6 * 3600, "24h": 24 * 3600, "7d": 7 * 86400, "30d": 30 * 86400}
+
+@app_commands.command(name="queue_history", description="Show recent Pixel Party queue activity.")
+@app_commands.guilds(discord.Object(id=900845277311815701)) 
+@app_commands.describe(period="How far back to look")
+async def queue_history_command(interaction: discord.Interaction, period: Literal["1h", "6h", "24h", "7d", "30d"] = "24h"):
+    summary = queue_history.summarize(HISTORY_PERIODS[period])
+    if summary is None:
+        await interaction.response.send_message("No queue data has been recorded for that period yet.", ephemeral=True)
+        return
+
+    peak, average, queueing_share, series = summary
+    embed = discord.Embed(
+        title=f"Pixel Party Queue History ({period})",
+        color=discord.Color.purple()
+    )
+    embed.add_field(name="**Peak players**", value=f"{peak}", inline=True)
+    embed.add_field(name="**Average players**", value=f"{average:.1f}", inline=True)
+    embed.add_field(name="**Time queueing**", value=f"{queueing_share * 100:.1f}%", inline=True)
+    embed.add_field(name="**Activity**", value=f"`{queue_history.sparkline(series)}`", inline=False)
+    embed.set_footer(text="Made by Dopa and Rawad")
+
+    await interaction.response.send_message(embed=embed)
+
+@app_commands.command(name="jobs", description="Show the bot's background jobs.")
+@app_commands.guilds(discord.Object(id=900845277311815701)) 
+async def jobs_command(interaction: discord.Interaction):
+    required_role_id = 1175761444957073508 # Staff Role PPY
+
+    if not any(role.id == required_role_id for role in interaction.user.roles):
+        await interaction.response.send_message("you don't have permission to execute this command.", ephemeral=True)
+        return
+
+    def ts(t): return f"<t:{int(t)}:R>" if t else "never"
+
+    embed = discord.Embed(title="Background Jobs", color=discord.Color.purple())
+    for job in jobs.all_jobs():
+        duration = f"{job.last_duration:.2f}s" if job.last_duration is not None else "-"
+        lines = [
+            f"**Last run**: {ts(job.last_run)} ({duration})",
+            f"**Next run**: {'running now' if job.running else ts(job.next_run)}",
+            f"**Runs**: {job.runs} (skipped {job.skipped})",
+        ]
+        if job.last_error:
+            lines.append(f"**Last error**: `{job.last_error[:200]}`")
+        embed.add_field(name=job.name, value="\n".join(lines), inline=False)
+    if not embed.fields:
+        embed.description = "No jobs are scheduled."
+    circuits = [f"**{b.name}**: {b.state} (opened {b.trips}x)" for b in breaker.all_breakers()]
+    if circuits:
+        embed.add_field(name="API circuits", value="\n".join(circuits), inline=False)
+    if startup.timings:
+        embed.set_footer(text="Startup: " + ", ".join(f"{phase} {t:.2f}s" for phase, t in startup.timings.items()))
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@app_commands.command(name="verify_stats", description="Show how often each verification check runs and rejects.")
+@app_commands.guilds(discord.Object(id=900845277311815701)) 
+async def verify_stats_command(interaction: discord.Interaction):
+    required_role_id = 1175761444957073508 # Staff Role PPY
+
+    if not any(role.id == required_role_id for role in interaction.user.roles):
+        await interaction.response.send_message("you don't have permission to execute this command.", ephemeral=True)
+        return
+
+    embed = discord.Embed(title="Verification Checks", color=discord.Color.purple())
+    for rule in verification.RULES:
+        rule_stats = verification.stats.get(rule.name)
+        if rule_stats is None:
+            continue
+        embed.add_field(
+            name=rule.name,
+            value=f"**Runs**: {rule_stats.runs}\n**Rejected**: {rule_stats.rejections}\n**Avg time**: {rule_stats.avg_ms:.1f}ms",
+            inline=True
+        )
+    if not embed.fields:
+        embed.description = "No verifications since the last restart."
+    embed.set_footer(text="Checks run cheapest first; counts reset on restart")
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 @app_commands.command(name="verification_config_arcade", description="Set or view verification settings for ARCADE server")
 @app_commands.guilds(discord.Object(id=730247359732383774)) 
 @app_commands.describe(setting="The setting you want to change or 'show_current_settings'", value="The new value to apply (not needed if viewing)")
@@ -337,9 +427,7 @@ async def arcade_set_verification(interaction: discord.Interaction, setting: Lit
     
     if setting == "show_current_settings":
         try:
-            with open("values.json", "r") as f:
-                data = json.load(f)
-            arcade_settings = data["servers"]["ARCADE_COMMUNITY"]
+            arcade_settings = config.get_settings("ARCADE_COMMUNITY")
             pretty = "\n".join(f"**{k}**: {v}" for k, v in arcade_settings.items())
             await interaction.response.send_message(f"**Current ARCADE Verification Settings:**\n{pretty}", ephemeral=True)
         except Exception as e:
@@ -377,9 +465,7 @@ async def ppy_set_verification(interaction: discord.Interaction, setting: Litera
         return
     if setting == "show_current_settings":
         try:
-            with open("values.json", "r") as f:
-                data = json.load(f)
-            ppy_settings = data["servers"]["PPY_COMMUNITY"]
+            ppy_settings = config.get_settings("PPY_COMMUNITY")
             pretty = "\n".join(f"**{k}**: {v}" for k, v in ppy_settings.items())
             await interaction.response.send_message(f"**Current PPY Community Verification Settings:**\n{pretty}", ephemeral=True)
         except Exception as e:
@@ -413,6 +499,8 @@ async def setup(bot):
     bot.tree.add_command(ppy_set_verification, guild=guild_two)
     bot.tree.add_command(stats, guild=guild_two)
     bot.tree.add_command(compare, guild=guild_two)
-    await bot.tree.sync(guild=guild_one)
-    await bot.tree.sync(guild=guild_two)
+    bot.tree.add_command(queue_history_command, guild=guild_two)
+    bot.tree.add_command(jobs_command, guild=guild_two)
+    bot.tree.add_command(verify_stats_command, guild=guild_two)
+    # Syncing happens in startup.sync_commands, only when the tree changed
 
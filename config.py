@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+from datetime import timedelta
+from typing import NamedTuple
+from state import write_json_atomic
+
+SETTINGS_FILE = "values.json"
+
+_lock = threading.Lock()
+_mtime = None
+_data = None
+_requirements = {}
+
+class Requirements(NamedTuple):
+    least_discord_account_age: str
+    least_hypixel_account_age: str
+    least_hypixel_level: int
+    discord_age: timedelta
+    hypixel_age: timedelta
+
+def parse_duration(duration_str):
+    unit = duration_str[-1]
+    amount = int(duration_str[:-1])
+    if unit == "d":
+        return timedelta(days=amount)
+    elif unit == "w":
+        return timedelta(weeks=amount)
+    elif unit == "m":
+        return timedelta(days=30 * amount)
+    elif unit == "y":
+        return timedelta(days=365 * amount)
+    else:
+        raise ValueError("Invalid time unit in duration string")
+
+def _compile(settings):
+    return Requirements(
+        least_discord_account_age=settings["least_discord_account_age"],
+        least_hypixel_account_age=settings["least_hypixel_account_age"],
+        least_hypixel_level=int(settings["least_hypixel_level"]),
+        discord_age=parse_duration(settings["least_discord_account_age"]),
+        hypixel_age=parse_duration(settings["least_hypixel_account_age"])
+    )
+
+def _refresh():
+    # Re-read values.json only when it changed on disk. A broken edit keeps
+    # the last good config instead of taking verification down.
+    global _mtime, _data, _requirements
+    mtime = os.stat(SETTINGS_FILE).st_mtime_ns
+    if mtime == _mtime:
+        return
+    try:
+        with open(SETTINGS_FILE, "r") as f:
+            data = json.load(f)
+        requirements = {name: _compile(settings) for name, settings in data["servers"].items()}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        if _data is None:
+            raise
+        print("error reloading settings, keeping previous ones:", e)
+        _mtime = mtime
+        return
+    _mtime, _data, _requirements = mtime, data, requirements
+
+def get_requirements(server):
+    _refresh()
+    return _requirements[server]
+
+def get_settings(server):
+    _refresh()
+    return dict(_data["servers"][server])
+
+def update_setting(server, setting_key, value):
+    global _mtime, _data
+    with _lock:
+        _refresh()
+        data = json.loads(json.dumps(_data)) # work on a copy until it's validated
+        if setting_key not in data["servers"][server]:
+            raise KeyError(setting_key)
+        data["servers"][server][setting_key] = value
+        requirements = _compile(data["servers"][server])
+
+        write_json_atomic(SETTINGS_FILE, data)
+        _data = data
+        _requirements[server] = requirements
+        _mtime = os.stat(SETTINGS_FILE).st_mtime_ns
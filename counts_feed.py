@@ -0,0 +1,62 @@
+import asyncio
+import hypixel
+
+POLL_INTERVAL = 10 # used when no subscriber asks for anything else
+MIN_INTERVAL = 5
+MAX_INTERVAL = 120
+MAX_BACKOFF = 300
+
+_subscribers = []
+latest = None # last /counts document, for anyone who wants it on demand
+
+def subscribe(callback):
+    # callback is an async function taking the /counts document. It may return
+    # how many seconds it'd like until the next poll; the shortest wish wins.
+    _subscribers.append(callback)
+    return lambda: _subscribers.remove(callback) if callback in _subscribers else None
+
+def mode_count(counts, game, mode=None):
+    # Player count for one mode of a game (or the whole game if mode is None)
+    try:
+        game_counts = counts["games"][game]
+    except (KeyError, TypeError):
+        return None
+    if mode is None:
+        return game_counts.get("players", 0)
+    return game_counts.get("modes", {}).get(mode, 0)
+
+async def publish(counts):
+    # Returns the next poll interval the subscribers asked for
+    global latest
+    latest = counts
+    results = await asyncio.gather(*(callback(counts) for callback in list(_subscribers)), return_exceptions=True)
+    wishes = []
+    for result in results:
+        if isinstance(result, Exception):
+            print("counts subscriber error:", result)
+        elif isinstance(result, (int, float)):
+            wishes.append(result)
+    interval = min(wishes) if wishes else POLL_INTERVAL
+    return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+async def poll_once():
+    # Returns the next poll interval, or None if the request failed
+    try:
+        counts = await hypixel.get_counts()
+    except hypixel.HypixelUnavailable as e:
+        print("error fetching player counts:", e)
+        return None
+    return await publish(counts)
+
+_failures = 0
+
+async def poll_job():
+    # One /counts request per run, no matter how many trackers listen. Returns
+    # the delay before the next run, backing off exponentially on errors.
+    global _failures
+    interval = await poll_once()
+    if interval is None:
+        _failures += 1
+        return min(MAX_BACKOFF, POLL_INTERVAL * 2 ** _failures)
+    _failures = 0
+    return interval
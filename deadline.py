@@ -0,0 +1,72 @@
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Hard ceilings on how long one interaction may keep a user waiting. Every
+# downstream call takes the smaller of its stage budget and what's left.
+COMMAND_BUDGET = 8 # /stats, /compare and the essentials buttons
+VERIFY_BUDGET = 20 # one verification attempt, from when a worker picks it up
+STAGE_BUDGETS = {
+    "mojang": 4,
+    "hypixel": 6, # includes waiting for a rate limit token
+    "discord": 5, # role and nickname edits
+}
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    pass
+
+def start(seconds=COMMAND_BUDGET):
+    # For interaction callbacks: discord.py runs each one in its own task,
+    # so the deadline ends with the task and needs no reset
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    _deadline.set(deadline if current is None else min(current, deadline))
+
+@contextmanager
+def scope(seconds):
+    # For long-lived tasks (queue workers) that handle one request at a time
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining():
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def timeout(stage=None):
+    # Seconds the next call in `stage` may take, None if nothing bounds it.
+    # Raises DeadlineExceeded if the interaction is already out of time.
+    budget = STAGE_BUDGETS.get(stage)
+    left = remaining()
+    if left is None:
+        return budget
+    if left <= 0:
+        raise DeadlineExceeded("interaction deadline passed")
+    return left if budget is None else min(budget, left)
+
+def clipped(stage, seconds):
+    # True if `seconds` from timeout(stage) is short of the stage's own budget,
+    # i.e. a timeout would be the interaction running out rather than the API
+    budget = STAGE_BUDGETS.get(stage)
+    return seconds is not None and budget is not None and seconds < budget
+
+async def wait_for(aw, stage=None):
+    try:
+        seconds = timeout(stage)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        raise
+    if seconds is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, seconds)
+    except asyncio.TimeoutError as e:
+        raise DeadlineExceeded(f"{stage or 'interaction'} budget ran out") from e
@@ -1,195 +1,50 @@
 import discord
-import os
-import requests
-import json
-from dotenv import load_dotenv
-from datetime import datetime
-
-load_dotenv()
-HYPIXEL_API_KEY = os.getenv("HYPIXEL_API_KEY")
+import hypixel
+import mojang
+import link_store
+import failures
+import panels
+import log_sink
+import deadline
+from win_roles import reconcile_win_roles
+from cache import MISSING
 
 ESSENTIALS_CHANNEL_ID = 1132491975598280814
 LOG_CHANNEL_ID = 907201334409826326
 
-WIN_ROLES = [
-    (50000, '1108326132379558038'),
-    (49000, '1108326080890277938'),
-    (48000, '1108326025840046141'),
-    (47000, '1108325974107504691'),
-    (46000, '1108325917459218503'),
-    (45000, '1108325869002424400'),
-    (44000, '1108325797237882991'),
-    (43000, '1108325743672438854'),
-    (42000, '1108325689515589632'),
-    (41000, '1108325637392977962'),
-    (40000, '1108325585576525885'),
-    (39000, '1108325528194269204'),
-    (38000, '1108325469083934810'),
-    (37000, '1108325409063452692'),
-    (36000, '1108325357909717035'),
-    (35000, '1108325302880452668'),
-    (34000, '1108325253748359218'),
-    (33000, '1108325200682033262'),
-    (32000, '1108325131056578581'),
-    (31000, '1108325079122722886'),
-    (30000, '1108325026110914581'),
-    (29000, '1108324975540195348'),
-    (28000, '1108324906816520232'),
-    (27000, '1108324850835140608'),
-    (26000, '1108324800344113213'),
-    (25000, '1108324746233401375'),
-    (24000, '1108324673244119131'),
-    (23000, '1108324597490790432'),
-    (22000, '1108324541496836107'),
-    (21000, '1108324472387280976'),
-    (20000, '1108324389872742452'),
-    (19000, '1108324333790711838'),
-    (18000, '1108324273891848192'),
-    (17000, '1108324201233920100'),
-    (16000, '1108324112889286666'),
-    (15000, '1108324061618126848'),
-    (14000, '1108323995033542666'),
-    (13000, '1108315273192288337'),
-    (12000, '1108313966901465100'),
-    (11000, '1108309512701616130'),
-    (10000, '1083073967138541589'),
-    (9000, '1083073849215684679'),
-    (8000, '1083073644185534535'),
-    (7000, '1063160742091685939'),
-    (6000, '1026199251434360832'),
-    (5000, '1020364100733247509'),
-    (4000, '1007981455969878036'),
-    (3000, '952452597191704628'),
-    (2000, '937363837303263263'),
-    (1000, '904422116433231953'),
-    (500, '901616321689681971'),
-    (250, '900855705437888583'),
-    (100, '900855548596088944'),
-]
-
-def get_uuid(name):
-    res = requests.get(f"https://api.mojang.com/users/profiles/minecraft/{name}")
-    if res.status_code == 200:
-        return res.json().get("id")
-    return None
-
-def get_pixel_party_wins(uuid):
-    url = f"https://api.hypixel.net/player?key={HYPIXEL_API_KEY}&uuid={uuid}"
-    try:
-        res = requests.get(url)
-        if res.status_code == 429:
-            return "__RATE_LIMITED__"
-        if res.status_code != 200:
-            return 0  # fallback for other errors
-        data = res.json()
-        arcade_stats = data.get("player", {}).get("stats", {}).get("Arcade", {})
-        for key in ["pixel_party", "pixelParty"]:
-            if key in arcade_stats:
-                return arcade_stats[key].get("wins", 0)
-        return arcade_stats.get("pixel_party_wins", 0)
-    except:
-        return 0
-
-def get_linked_discord(uuid):
-    url = f"https://api.hypixel.net/player?key={HYPIXEL_API_KEY}&uuid={uuid}"
-    try:
-        res = requests.get(url)
-        if res.status_code != 200:
-            return "__API_ERROR__"
-        data = res.json()
-        return data.get("player", {}).get("socialMedia", {}).get("links", {}).get("DISCORD")
-    except:
-        return "__API_ERROR__"
+async def get_uuid(name):
+    return await mojang.get_uuid(name)
 
+class NicknameModal(discord.ui.Modal, title="Change Ingame Name"):
     new_name = discord.ui.TextInput(label="Your new ingame name")
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
+        deadline.start()
         ign = self.new_name.value
-        uuid = get_uuid(ign)
         log_channel = interaction.client.get_channel(LOG_CHANNEL_ID)
 
-        if not uuid:
+        try:
+            uuid = await get_uuid(ign)
+        except mojang.MojangUnavailable:
             embed = discord.Embed(
-                title="❌ Invalid IGN",
-                description=f"`{ign}` is not a valid Minecraft username.",
-                color=discord.Color.red()
+                title="⚠️ Service Unavailable",
+                description="Mojang API is currently not responding.\nTry again in a few minutes.",
+                color=discord.Color.orange()
             )
             await interaction.followup.send(embed=embed, ephemeral=True)
-            if log_channel:
-                await log_channel.send(f"[Nickname Change] ❌ `{interaction.user}` tried to set invalid IGN: `{ign}`")
-            return
 
-        linked = get_linked_discord(uuid)
-        if linked != str(interaction.user):
-            embed = discord.Embed(
-                title="❌ Verification Failed",
-                description="Your Discord tag doesn't match the IGN's linked account on Hypixel.",
-                color=discord.Color.red()
+            log = discord.Embed(
+                title="⚠️ Nickname Update Failed",
+                description="Mojang API failed to respond or rate-limited.",
+                color=discord.Color.orange()
             )
-            embed.add_field(name="Entered IGN", value=f"`{ign}`", inline=False)
-            embed.add_field(name="Linked Discord", value=f"`{linked or 'None'}`", inline=False)
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            if log_channel:
-                await log_channel.send(f"[Nickname Change] ❌ `{interaction.user}` tried to verify with `{ign}` but tag didn't match (`{linked}`)")
+            log.add_field(name="User", value=interaction.user.mention, inline=True)
+            log.add_field(name="Submitted IGN", value=f"`{ign}`", inline=True)
+            log_sink.send(log_channel, log)
             return
 
-        try:
-            await interaction.user.edit(nick=ign)
-            embed = discord.Embed(
-                title="✅ Nickname Updated",
-                description=f"Your server nickname is now `{ign}`.",
-                color=discord.Color.green()
-            )
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            if log_channel:
-                await log_channel.send(f"[Nickname Change] ✅ `{interaction.user}` successfully changed nickname to `{ign}`")
-        except discord.Forbidden:
-            embed = discord.Embed(
-                title="❌ Nickname Change Failed",
-                description="I don't have permission to change your nickname.",
-                color=discord.Color.red()
-            )
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            if log_channel:
-                await log_channel.send(f"[Nickname Change] ❌ `{interaction.user}` attempted to change nickname to `{ign}`, but I lacked permission.")
-
-class NicknameModal(discord.ui.Modal, title="Change Ingame Name"):
-    new_name = discord.ui.TextInput(label="Your new ingame name")
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        ign = self.new_name.value
-        log_channel = interaction.client.get_channel(LOG_CHANNEL_ID)
-
-        try:
-            uuid = get_uuid(ign)
-        except Exception:
-            uuid = None
-
         if uuid is None:
-            try:
-                test_res = requests.get(f"https://api.mojang.com/users/profiles/minecraft/{ign}")
-                if test_res.status_code != 200:
-                    raise Exception()
-            except Exception:
-                embed = discord.Embed(
-                    title="⚠️ Service Unavailable",
-                    description="Mojang API is currently not responding.\nTry again in a few minutes.",
-                    color=discord.Color.orange()
-                )
-                await interaction.followup.send(embed=embed, ephemeral=True)
-
-                log = discord.Embed(
-                    title="⚠️ Nickname Update Failed",
-                    description="Mojang API failed to respond or rate-limited.",
-                    color=discord.Color.orange()
-                )
-                log.add_field(name="User", value=interaction.user.mention, inline=True)
-                log.add_field(name="Submitted IGN", value=f"`{ign}`", inline=True)
-                await log_channel.send(embed=log)
-                return
-
             embed = discord.Embed(
                 title="❌ Invalid IGN",
                 description=f"`{ign}` is not a valid Minecraft username.",
@@ -204,11 +59,22 @@ class NicknameModal(discord.ui.Modal, title="Change Ingame Name"):
             )
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="Submitted IGN", value=f"`{ign}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
             return
 
-        linked = get_linked_discord(uuid)
-        if linked == "__API_ERROR__":
+        # Same account they verified with: ownership was already proven then
+        link = link_store.get_link(interaction.user.id, interaction.guild.id)
+        already_linked = link is not None and link[0] == uuid
+
+        # A recent failed check for this account is answered from memory
+        linked = str(interaction.user) if already_linked else failures.recall_link(uuid, str(interaction.user))
+        snapshot = None
+        if linked is MISSING:
+            try:
+                snapshot = await hypixel.get_snapshot(uuid, max_age=hypixel.LINK_CHECK_MAX_AGE)
+            except hypixel.HypixelUnavailable:
+                pass
+        if snapshot is None and linked is MISSING:
             embed = discord.Embed(
                 title="⚠️ Service Unavailable",
                 description="Hypixel API is currently not responding or rate-limited.\nTry again later.",
@@ -223,9 +89,12 @@ class NicknameModal(discord.ui.Modal, title="Change Ingame Name"):
             )
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="IGN", value=f"`{ign}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
             return
 
+        if snapshot is not None:
+            failures.remember_snapshot(snapshot, str(interaction.user))
+            linked = snapshot.linked_discord
         if linked != str(interaction.user):
             embed = discord.Embed(
                 title="❌ Couldn’t Update Nickname",
@@ -244,7 +113,7 @@ class NicknameModal(discord.ui.Modal, title="Change Ingame Name"):
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="Submitted IGN", value=f"`{ign}`", inline=True)
             log.add_field(name="IGN's Linked Discord", value=f"`{linked or 'None'}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
             return
 
         current_nick = interaction.user.nick or interaction.user.name
@@ -263,11 +132,13 @@ class NicknameModal(discord.ui.Modal, title="Change Ingame Name"):
             )
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="IGN", value=f"`{ign}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
             return
 
         try:
-            await interaction.user.edit(nick=ign)
+            await deadline.wait_for(interaction.user.edit(nick=ign), "discord")
+            if link:
+                link_store.update_ign(uuid, ign)
             embed = discord.Embed(
                 title="✅ Nickname Updated",
                 description=f"Your nickname was successfully changed to `{ign}`.",
@@ -282,7 +153,14 @@ class NicknameModal(discord.ui.Modal, title="Change Ingame Name"):
             )
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="New Nickname", value=f"`{ign}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
+        except deadline.DeadlineExceeded:
+            embed = discord.Embed(
+                title="⚠️ Discord Is Slow",
+                description="Discord didn't apply the nickname in time. Please try again in a bit.",
+                color=discord.Color.orange()
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
         except discord.Forbidden:
             embed = discord.Embed(
                 title="❌ Couldn’t Change Nickname",
@@ -298,20 +176,42 @@ class NicknameModal(discord.ui.Modal, title="Change Ingame Name"):
             )
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="Attempted Nickname", value=f"`{ign}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
 
 class EssentialsButtonView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
 
-    @discord.ui.button(label="Wins", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Wins", style=discord.ButtonStyle.blurple, custom_id="essentials:wins")
     async def wins_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer(ephemeral=True)
+        deadline.start()
         log_channel = interaction.client.get_channel(LOG_CHANNEL_ID)
         member = interaction.guild.get_member(interaction.user.id)
-        ign = member.nick or member.name
+        link = link_store.get_link(member.id, interaction.guild.id)
+        if link:
+            uuid, ign = link
+        else:
+            ign = member.nick or member.name
+            try:
+                uuid = await get_uuid(ign)
+            except mojang.MojangUnavailable:
+                embed = discord.Embed(
+                    title="⚠️ Service Unavailable",
+                    description="Mojang API is currently not responding.\nTry again in a few minutes.",
+                    color=discord.Color.orange()
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
 
-        uuid = get_uuid(ign)
+                log = discord.Embed(
+                    title="⚠️ Win Role Assignment Failed",
+                    description="Mojang API failed to respond or rate-limited.",
+                    color=discord.Color.orange()
+                )
+                log.add_field(name="User", value=interaction.user.mention, inline=True)
+                log.add_field(name="Submitted Nickname", value=f"`{ign}`", inline=True)
+                log_sink.send(log_channel, log)
+                return
         if not uuid:
             embed = discord.Embed(
                 title="❌ Invalid IGN",
@@ -327,11 +227,31 @@ class EssentialsButtonView(discord.ui.View):
             )
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="Submitted Nickname", value=f"`{ign}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
+            return
+
+        snapshot = None
+        rate_limited = False
+        no_account = failures.recall("no_hypixel_account", uuid) is not MISSING
+        if not no_account:
+            try:
+                snapshot = await hypixel.get_snapshot(uuid)
+            except hypixel.HypixelUnavailable as e:
+                rate_limited = e.rate_limited
+            else:
+                if not snapshot.exists:
+                    failures.remember("no_hypixel_account", uuid)
+
+        if snapshot is None and not no_account and hypixel.breaker.is_open:
+            embed = discord.Embed(
+                title="⚠️ Service Degraded",
+                description="The Hypixel API is having problems right now. Try again in a few minutes.",
+                color=discord.Color.orange()
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        wins = get_pixel_party_wins(uuid)
-        if wins == "__RATE_LIMITED__":
+        if rate_limited:
             embed = discord.Embed(
                 title="⚠️ Rate Limited",
                 description="The Hypixel API is currently rate-limiting me. Try again in a bit.",
@@ -346,16 +266,35 @@ class EssentialsButtonView(discord.ui.View):
             )
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="IGN", value=f"`{ign}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
+            return
+
+        if snapshot is None and not no_account:
+            embed = discord.Embed(
+                title="⚠️ Service Unavailable",
+                description="Hypixel API is currently not responding.\nTry again in a few minutes.",
+                color=discord.Color.orange()
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        granted_roles = []
-        for threshold, role_id in WIN_ROLES:
-            if wins >= threshold:
-                await member.add_roles(discord.Object(id=role_id), reason="Pixel Party win role assignment")
-                granted_roles.append(threshold)
+        wins = snapshot.pixel_party_wins if snapshot else 0
+
+        # Only a real Hypixel profile may take roles away; a missing account
+        # (or one we only remember as missing) just earns nothing new
+        prune = snapshot is not None and snapshot.exists
+        try:
+            granted_roles, removed_roles = await deadline.wait_for(reconcile_win_roles(member, wins, prune=prune), "discord")
+        except deadline.DeadlineExceeded:
+            embed = discord.Embed(
+                title="⚠️ Discord Is Slow",
+                description="Discord didn't apply your roles in time. Please try again in a bit.",
+                color=discord.Color.orange()
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
 
-        if granted_roles:
+        if granted_roles or removed_roles:
             embed = discord.Embed(
                 title="✅ Roles Granted",
                 description=f"{len(granted_roles)} roles assigned for `{wins}` wins.",
@@ -372,7 +311,9 @@ class EssentialsButtonView(discord.ui.View):
             log.add_field(name="IGN", value=f"`{ign}`", inline=True)
             log.add_field(name="Wins", value=f"`{wins}`", inline=True)
             log.add_field(name="Roles Given", value=f"{len(granted_roles)}", inline=True)
-            await log_channel.send(embed=log)
+            if removed_roles:
+                log.add_field(name="Roles Removed", value=f"{len(removed_roles)}", inline=True)
+            log_sink.send(log_channel, log)
         else:
             embed = discord.Embed(
                 title="No Roles Given",
@@ -389,9 +330,9 @@ class EssentialsButtonView(discord.ui.View):
             log.add_field(name="User", value=interaction.user.mention, inline=True)
             log.add_field(name="IGN", value=f"`{ign}`", inline=True)
             log.add_field(name="Wins", value=f"`{wins}`", inline=True)
-            await log_channel.send(embed=log)
+            log_sink.send(log_channel, log)
 
-    @discord.ui.button(label="Nickname", style=discord.ButtonStyle.green)
+    @discord.ui.button(label="Nickname", style=discord.ButtonStyle.green, custom_id="essentials:nickname")
     async def nickname_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(NicknameModal())
 
@@ -400,10 +341,6 @@ async def send_essentials_message(bot):
     if not channel:
         return
 
-    async for msg in channel.history(limit=1):
-        if msg.author == bot.user:
-            await msg.delete() # Delete the previous message when the bot starts up
-
     embed = discord.Embed(
         title="Pixel Party Essentials",
         description=(
@@ -415,4 +352,4 @@ async def send_essentials_message(bot):
     )
     embed.set_footer(text="Essentials System • Pixel Party Community")
 
-    await channel.send(embed=embed, view=EssentialsButtonView())
+    await panels.ensure_panel(bot, "essentials", channel, embed, EssentialsButtonView())
@@ -0,0 +1,51 @@
+from cache import TTLCache, MISSING
+
+# Seconds a failed account check is answered from memory. Retry spam inside
+# the window costs no API quota, and it's short enough that someone who
+# fixes the problem (joins Hypixel, links their Discord) isn't stuck.
+# Invalid IGNs are already remembered by mojang's own negative cache.
+REASON_TTL = {
+    "no_hypixel_account": 120,
+    "no_discord_link": 60,
+    "tag_mismatch": 60, # detail is the Discord tag that is linked instead
+}
+
+# (reason, uuid) -> detail
+_failures = TTLCache(5000, 60)
+
+def _norm(uuid):
+    return uuid.replace("-", "").lower()
+
+def remember(reason, uuid, detail=True):
+    _failures.set((reason, _norm(uuid)), detail, ttl=REASON_TTL[reason])
+
+def recall(reason, uuid):
+    return _failures.get((reason, _norm(uuid)))
+
+def remember_snapshot(snapshot, user_tag):
+    # Records why this snapshot can't prove the account belongs to user_tag
+    if not snapshot.exists:
+        remember("no_hypixel_account", snapshot.uuid)
+    elif not snapshot.linked_discord:
+        remember("no_discord_link", snapshot.uuid)
+    elif snapshot.linked_discord != user_tag:
+        remember("tag_mismatch", snapshot.uuid, snapshot.linked_discord)
+
+def recall_link(uuid, user_tag):
+    # The Discord tag a recent failed check saw linked to uuid (None for no
+    # account or no link), or MISSING if nothing is remembered
+    if recall("no_hypixel_account", uuid) is not MISSING or recall("no_discord_link", uuid) is not MISSING:
+        return None
+    linked = recall("tag_mismatch", uuid)
+    if linked is not MISSING and linked == user_tag:
+        return MISSING # they changed their tag to match, check for real
+    return linked
+
+def forget(uuid):
+    # Invalidation hook: fresh player data or a manual reset supersedes
+    # anything remembered about this account
+    for reason in REASON_TTL:
+        _failures.invalidate((reason, _norm(uuid)))
+
+def clear():
+    _failures.clear()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+from collections import deque
+import aiohttp
+import deadline
+from typing import NamedTuple
+
+try:
+    import orjson # optional, several times faster on large Hypixel documents
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+TOTAL_TIMEOUT = 10 # seconds, hard ceiling for a single request
+CONNECT_TIMEOUT = 3
+MAX_CONNECTIONS = 50
+MAX_CONNECTIONS_PER_HOST = 10
+KEEPALIVE_TIMEOUT = 30
+
+# Hedging: a lookup slower than this percentile of recent ones gets a second
+# request, and whichever answers first wins
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_DELAY = 0.25 # seconds
+HEDGE_MIN_SAMPLES = 20 # no hedging until we know what "slow" means
+HEDGE_RATIO = 0.05 # hedges earned per plain request, caps the extra load at ~5%
+HEDGE_BURST = 5
+
+# Everything a caller should treat as "the API didn't answer"
+RequestError = (aiohttp.ClientError, asyncio.TimeoutError)
+
+_session = None
+
+class Response(NamedTuple):
+    status: int
+    body: bytes
+    headers: dict
+
+    def json(self):
+        return _loads(self.body)
+
+def get_session():
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=TOTAL_TIMEOUT, connect=CONNECT_TIMEOUT)
+        )
+    return _session
+
+async def get(url, params=None, timeout=None):
+    session = get_session()
+    kwargs = {"params": params}
+    if timeout is None:
+        timeout = deadline.timeout() # whatever the current interaction has left
+    if timeout is not None:
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout, connect=min(timeout, CONNECT_TIMEOUT))
+    async with session.get(url, **kwargs) as res:
+        body = await res.read()
+        return Response(res.status, body, res.headers)
+
+async def close():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+class Hedger:
+    # One per endpoint. Tracks that endpoint's latency and how many hedges
+    # it may still spend, so a slow spell can't double the request rate.
+    def __init__(self, name, percentile=HEDGE_PERCENTILE, ratio=HEDGE_RATIO):
+        self.name = name
+        self.percentile = percentile
+        self.ratio = ratio
+        self.latencies = deque(maxlen=200)
+        self.credits = float(HEDGE_BURST)
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def delay(self):
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return max(HEDGE_MIN_DELAY, ordered[int(self.percentile * (len(ordered) - 1))])
+
+    def _timed(self, url, params, timeout):
+        started = time.monotonic()
+        task = asyncio.ensure_future(get(url, params, timeout))
+        # a cancelled loser still counts, its elapsed time is a lower bound
+        task.add_done_callback(lambda t: self.latencies.append(time.monotonic() - started))
+        return task
+
+    async def get(self, url, params=None, timeout=None, alternate_url=None, alternate_params=None):
+        # alternate_url is an equivalent endpoint to send the hedge to; by
+        # default the same request is simply sent again
+        self.credits = min(HEDGE_BURST, self.credits + self.ratio)
+        if timeout is None:
+            timeout = deadline.timeout()
+        primary = self._timed(url, params, timeout)
+        tasks = {primary}
+        try:
+            delay = self.delay()
+            if delay is None or (timeout is not None and timeout <= delay):
+                return await primary
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or self.credits < 1:
+                return await primary
+
+            self.credits -= 1
+            self.hedges += 1
+            hedge = asyncio.ensure_future(get(
+                alternate_url or url,
+                alternate_params if alternate_url else params,
+                None if timeout is None else timeout - delay
+            ))
+            tasks.add(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            return await primary # both failed, surface the original error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel() # the loser
@@ -0,0 +1,181 @@
+import asyncio
+import contextvars
+import os
+import time
+import http_client
+import rate_limit
+import deadline
+import failures
+from breaker import CircuitBreaker, register
+from cache import TTLCache, MISSING
+from dotenv import load_dotenv
+
+load_dotenv()
+HYPIXEL_API_KEY = os.getenv("HYPIXEL_API_KEY")
+PLAYER_URL = "https://api.hypixel.net/player"
+COUNTS_URL = "https://api.hypixel.net/counts"
+
+PLAYER_CACHE_SIZE = 5000
+PLAYER_FRESHNESS = 60 # seconds a /player snapshot is served from memory
+NO_PLAYER_FRESHNESS = 30 # "never joined Hypixel" results
+LAST_KNOWN_TTL = 6 * 60 * 60
+
+# Anything that decides who someone is (verification, nickname) should ask for
+# fresher data than this so a freshly linked Discord shows up quickly.
+LINK_CHECK_MAX_AGE = 15
+
+# uuid -> PlayerSnapshot
+_players = TTLCache(PLAYER_CACHE_SIZE, PLAYER_FRESHNESS, negative_ttl=NO_PLAYER_FRESHNESS)
+_inflight = {}
+# uuid -> PlayerSnapshot, kept much longer as a fallback when Hypixel is slow
+_last_known = TTLCache(PLAYER_CACHE_SIZE, LAST_KNOWN_TTL)
+
+class HypixelUnavailable(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def rate_limited(self):
+        return self.status == 429
+
+async def _request(url, params, priority, ticket=None):
+    # Every keyed Hypixel call goes through here so the limiter sees all of
+    # them. An open circuit fails before spending a token.
+    try:
+        deadline.timeout("hypixel")
+    except deadline.DeadlineExceeded as e:
+        raise HypixelUnavailable("out of time for a Hypixel request") from e
+    if not breaker.allow():
+        raise HypixelUnavailable("Hypixel API is degraded")
+    try:
+        await deadline.wait_for(rate_limit.hypixel_limiter.acquire(priority, ticket), "hypixel")
+        # the request itself gets a fresh stage budget, still capped by
+        # whatever the interaction has left
+        timeout = deadline.timeout("hypixel")
+    except deadline.DeadlineExceeded as e:
+        breaker.release()
+        raise HypixelUnavailable("timed out waiting for the rate limiter") from e
+    except BaseException:
+        breaker.release()
+        raise
+    started = time.monotonic()
+    try:
+        res = await http_client.get(url, params={"key": HYPIXEL_API_KEY, **params}, timeout=timeout)
+    except BaseException as e:
+        rate_limit.hypixel_limiter.release()
+        if isinstance(e, http_client.RequestError):
+            if isinstance(e, asyncio.TimeoutError) and deadline.clipped("hypixel", timeout):
+                breaker.release() # our own deadline cut it short, not Hypixel's fault
+            else:
+                breaker.record(False)
+            raise HypixelUnavailable(str(e) or type(e).__name__) from e
+        breaker.release()
+        raise
+    rate_limit.hypixel_limiter.update(res.headers, res.status)
+    # 429s are the limiter's business; only server errors mean Hypixel is down
+    breaker.record(res.status < 500, time.monotonic() - started)
+
+    if res.status != 200:
+        raise HypixelUnavailable(f"Hypixel API returned {res.status}", res.status)
+    data = res.json()
+    if not data.get("success"):
+        raise HypixelUnavailable(data.get("cause") or "Hypixel API request was not successful", res.status)
+    return data
+
+# Only these Pixel Party counters are ever displayed, so that's all we keep
+PIXEL_PARTY_FIELDS = (
+    "wins", "games_played", "rounds_completed", "power_ups_collected",
+    "wins_hyper", "games_played_hyper", "rounds_completed_hyper", "power_ups_collected_hyper",
+)
+
+class PlayerSnapshot:
+    # Everything the bot reads from a /player document. The full document is
+    # hundreds of KB, so it's dropped as soon as these fields are pulled out.
+    __slots__ = ("uuid", "exists", "display_name", "linked_discord", "network_exp", "first_login", "pixel_party")
+
+    def __init__(self, uuid, player):
+        self.uuid = uuid
+        self.exists = bool(player)
+        player = player or {}
+        self.display_name = player.get("displayname")
+        self.linked_discord = player.get("socialMedia", {}).get("links", {}).get("DISCORD")
+        self.network_exp = player.get("networkExp", 0)
+        self.first_login = player.get("firstLogin")
+        self.pixel_party = _extract_pixel_party(player.get("stats", {}).get("Arcade", {}))
+
+    @property
+    def pixel_party_wins(self):
+        return (self.pixel_party or {}).get("wins", 0)
+
+def _extract_pixel_party(arcade_stats):
+    # Depending on when the player last played, Hypixel stores Pixel Party
+    # stats under either key, or only as a flat win counter.
+    if "pixel_party" in arcade_stats:
+        stats = arcade_stats["pixel_party"]
+    elif "pixelParty" in arcade_stats:
+        stats = arcade_stats["pixelParty"]
+    elif "pixel_party_wins" in arcade_stats:
+        return {"wins": arcade_stats["pixel_party_wins"]}
+    else:
+        return None
+    return {k: stats[k] for k in PIXEL_PARTY_FIELDS if k in stats}
+
+async def _fetch_snapshot(uuid, ticket):
+    data = await _request(PLAYER_URL, {"uuid": uuid}, ticket.priority, ticket)
+    snapshot = PlayerSnapshot(uuid, data.get("player"))
+    _players.set(uuid, snapshot, ttl=None if snapshot.exists else NO_PLAYER_FRESHNESS)
+    _last_known.set(uuid, snapshot)
+    failures.forget(uuid) # fresh data outranks any remembered failure
+    return snapshot
+
+def _fetch_done(uuid, task):
+    _inflight.pop(uuid, None)
+    if not task.cancelled():
+        task.exception() # mark as retrieved even if every waiter went away
+
+async def get_snapshot(uuid, max_age=None, priority=rate_limit.PRIORITY_INTERACTIVE):
+    # Concurrent calls for the same uuid share a single request, queued at the
+    # most urgent priority among everyone waiting on it.
+    uuid = uuid.replace("-", "").lower()
+    cached = _players.get(uuid, max_age=max_age)
+    if cached is not MISSING:
+        return cached
+
+    try:
+        deadline.timeout("hypixel")
+    except deadline.DeadlineExceeded as e:
+        raise HypixelUnavailable("out of time for a Hypixel request") from e
+
+    if uuid in _inflight:
+        task, ticket = _inflight[uuid]
+        # a verification joining a background sync's fetch shouldn't wait
+        # behind the sync's place in the queue
+        rate_limit.hypixel_limiter.promote(ticket, priority)
+    else:
+        ticket = rate_limit.Ticket(priority)
+        # Started in an empty context so the shared fetch isn't bound by the
+        # deadline of whoever happened to ask first
+        task = contextvars.Context().run(asyncio.ensure_future, _fetch_snapshot(uuid, ticket))
+        _inflight[uuid] = (task, ticket)
+        task.add_done_callback(lambda t: _fetch_done(uuid, t))
+    # shield so one impatient caller can't cancel the fetch for everyone else;
+    # each caller still gives up when its own deadline passes
+    try:
+        return await deadline.wait_for(asyncio.shield(task), "hypixel")
+    except deadline.DeadlineExceeded as e:
+        raise HypixelUnavailable("timed out waiting for Hypixel") from e
+
+def last_known_snapshot(uuid):
+    # Most recent snapshot even if it's past PLAYER_FRESHNESS, for answering
+    # something when a fresh fetch can't finish in time
+    return _last_known.get(uuid.replace("-", "").lower(), None)
+
+def invalidate_player(uuid):
+    _players.invalidate(uuid.replace("-", "").lower())
+    failures.forget(uuid)
+
+async def get_counts(priority=rate_limit.PRIORITY_BACKGROUND):
+    return await _request(COUNTS_URL, {}, priority)
+
+breaker = register(CircuitBreaker("hypixel", probe=get_counts))
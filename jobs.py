@@ -0,0 +1,135 @@
+import asyncio
+import heapq
+import random
+import time
+from datetime import datetime, timedelta
+
+class Job:
+    def __init__(self, name, func, next_delay, jitter=0.0):
+        self.name = name
+        self.func = func
+        self.next_delay = next_delay # fn(result of last run) -> seconds until next run
+        self.jitter = jitter
+        self.next_run = None # time.time() based, for display and ordering
+        self.last_run = None
+        self.last_duration = None
+        self.last_error = None
+        self.runs = 0
+        self.skipped = 0
+        self.task = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+_jobs = {}
+_heap = [] # (next_run, seq, name), stale entries are skipped when popped
+_seq = 0
+_wakeup = asyncio.Event()
+_runner = None
+
+def _push(job, delay):
+    global _seq
+    if job.jitter:
+        delay += random.uniform(0, job.jitter)
+    job.next_run = time.time() + max(0.0, delay)
+    _seq += 1
+    heapq.heappush(_heap, (job.next_run, _seq, job.name))
+    _wakeup.set()
+
+def _register(name, func, next_delay, first_delay, jitter):
+    # Registering an existing name is a no-op, so calling setup code again
+    # (e.g. after a gateway reconnect) never stacks a second copy of a job
+    if name in _jobs:
+        return _jobs[name]
+    job = Job(name, func, next_delay, jitter)
+    _jobs[name] = job
+    _push(job, first_delay)
+    return job
+
+def every(name, seconds, func, jitter=0.0, first_delay=0.0):
+    # If func returns a number, that's used as the delay before its next run
+    def next_delay(result):
+        return result if isinstance(result, (int, float)) else seconds
+    return _register(name, func, next_delay, first_delay, jitter)
+
+def seconds_until(hour=0, minute=0, tz=None):
+    now = datetime.now(tz)
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target = (now + timedelta(days=1)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return (target - now).total_seconds()
+
+def daily(name, func, hour=0, minute=0, tz=None, jitter=0.0):
+    # Cron-style "at HH:MM every day" in the given timezone
+    return _register(name, func, lambda _: seconds_until(hour, minute, tz), seconds_until(hour, minute, tz), jitter)
+
+async def _run(job):
+    started = time.monotonic()
+    job.last_run = time.time()
+    result = None
+    try:
+        result = await job.func()
+        job.last_error = None
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        job.last_error = f"{type(e).__name__}: {e}"
+        print(f"job {job.name} failed:", e)
+    finally:
+        job.last_duration = time.monotonic() - started
+        job.runs += 1
+    if _jobs.get(job.name) is job:
+        _push(job, job.next_delay(result))
+
+async def _loop():
+    while True:
+        while _heap and (_heap[0][2] not in _jobs or _jobs[_heap[0][2]].next_run != _heap[0][0]):
+            heapq.heappop(_heap) # cancelled or rescheduled
+
+        if not _heap:
+            _wakeup.clear()
+            await _wakeup.wait()
+            continue
+
+        due, _, name = _heap[0]
+        delay = due - time.time()
+        if delay > 0:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        heapq.heappop(_heap)
+        job = _jobs[name]
+        if job.running:
+            # Previous run is still going; don't overlap, try again next period
+            job.skipped += 1
+            _push(job, job.next_delay(None))
+            continue
+        job.task = asyncio.create_task(_run(job))
+
+def start():
+    global _runner
+    if _runner is None or _runner.done():
+        _runner = asyncio.create_task(_loop())
+
+def cancel(name):
+    job = _jobs.pop(name, None)
+    if job and job.running:
+        job.task.cancel()
+
+async def stop():
+    global _runner
+    tasks = [job.task for job in _jobs.values() if job.running]
+    if _runner is not None:
+        tasks.append(_runner)
+        _runner = None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+def all_jobs():
+    return sorted(_jobs.values(), key=lambda job: job.name)
@@ -0,0 +1,62 @@
+import sqlite3
+import time
+
+DB_FILE = "links.db"
+
+_conn = None
+
+def _db():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(DB_FILE)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS links (
+                discord_id INTEGER NOT NULL,
+                guild_id INTEGER NOT NULL,
+                uuid TEXT NOT NULL,
+                ign TEXT NOT NULL,
+                verified_at INTEGER NOT NULL,
+                PRIMARY KEY (discord_id, guild_id)
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS links_uuid ON links (uuid)")
+        _conn.commit()
+    return _conn
+
+def save_link(discord_id, guild_id, uuid, ign):
+    db = _db()
+    db.execute(
+        "INSERT OR REPLACE INTO links (discord_id, guild_id, uuid, ign, verified_at) VALUES (?, ?, ?, ?, ?)",
+        (discord_id, guild_id, uuid, ign, int(time.time()))
+    )
+    db.commit()
+
+def update_ign(uuid, ign):
+    db = _db()
+    db.execute("UPDATE links SET ign = ? WHERE uuid = ?", (ign, uuid))
+    db.commit()
+
+def get_link(discord_id, guild_id=None):
+    # Returns (uuid, ign) for the member, preferring the given guild and
+    # otherwise their most recent verification anywhere.
+    if guild_id is not None:
+        row = _db().execute(
+            "SELECT uuid, ign FROM links WHERE discord_id = ? AND guild_id = ?", (discord_id, guild_id)
+        ).fetchone()
+        if row:
+            return row
+    return _db().execute(
+        "SELECT uuid, ign FROM links WHERE discord_id = ? ORDER BY verified_at DESC LIMIT 1", (discord_id,)
+    ).fetchone()
+
+def remove_link(discord_id, guild_id):
+    db = _db()
+    db.execute("DELETE FROM links WHERE discord_id = ? AND guild_id = ?", (discord_id, guild_id))
+    db.commit()
+
+def close():
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections import deque
+import discord
+
+BATCH_SIZE = 10 # embeds per message, Discord's cap
+MAX_EMBED_CHARS = 6000 # combined embed text per message, also Discord's cap
+FLUSH_DELAY = 2 # seconds the first queued embed waits for others to join it
+RETRY_DELAY = 5
+MAX_PENDING = 500 # per channel, oldest entries are dropped past this
+# Discord's per-part limits; log embeds echo user input (IGNs, nicknames)
+# that can easily be longer
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+
+class _Channel:
+    def __init__(self, channel):
+        self.channel = channel
+        self.pending = deque(maxlen=MAX_PENDING)
+        self.due = 0.0
+        self.backoff_until = 0.0
+
+    def ready(self, now):
+        if not self.pending or now < self.backoff_until:
+            return False
+        return len(self.pending) >= BATCH_SIZE or now >= self.due
+
+    def next_check(self):
+        return max(self.due, self.backoff_until)
+
+_channels = {}
+_wakeup = asyncio.Event()
+_worker = None
+
+def _clip(text, limit):
+    if text is None or len(text) <= limit:
+        return text
+    return text[:limit - 1] + "…"
+
+def _clip_embed(embed):
+    embed.title = _clip(embed.title, TITLE_LIMIT)
+    embed.description = _clip(embed.description, DESCRIPTION_LIMIT)
+    for i, field in enumerate(embed.fields):
+        embed.set_field_at(
+            i,
+            name=_clip(str(field.name), FIELD_NAME_LIMIT),
+            value=_clip(str(field.value), FIELD_VALUE_LIMIT),
+            inline=field.inline
+        )
+    return embed
+
+def send(channel, embed):
+    # Queues a log embed and returns right away; nothing here touches Discord
+    global _worker
+    if channel is None:
+        return
+    entry = _channels.get(channel.id)
+    if entry is None:
+        entry = _channels[channel.id] = _Channel(channel)
+    entry.channel = channel
+    if not entry.pending:
+        entry.due = time.monotonic() + FLUSH_DELAY
+    entry.pending.append(_clip_embed(embed))
+    if _worker is None or _worker.done():
+        _worker = asyncio.create_task(_run())
+    else:
+        _wakeup.set()
+
+def _take_batch(entry):
+    batch = []
+    chars = 0
+    while entry.pending and len(batch) < BATCH_SIZE:
+        size = len(entry.pending[0])
+        if batch and chars + size > MAX_EMBED_CHARS:
+            break
+        batch.append(entry.pending.popleft())
+        chars += size
+    return batch
+
+async def _send_batch(entry, batch):
+    # discord.py already waits out 429s on its own; this handles what's left
+    try:
+        await entry.channel.send(embeds=batch)
+    except asyncio.CancelledError:
+        entry.pending.extendleft(reversed(batch))
+        raise
+    except discord.HTTPException as e:
+        if e.status >= 500 or e.status == 429:
+            return _retry_later(entry, batch, e)
+        # Any other 4xx (missing access, unknown channel, invalid form body)
+        # will fail the same way every time, so it must not be requeued
+        if len(batch) == 1:
+            print("log sink dropping embed:", e)
+            return True
+        # send them one by one so only the bad embed is lost
+        for i, embed in enumerate(batch):
+            if not await _send_batch(entry, [embed]):
+                entry.pending.popleft()
+                entry.pending.extendleft(reversed(batch[i:]))
+                return False
+    except (OSError, asyncio.TimeoutError) as e:
+        return _retry_later(entry, batch, e)
+    return True
+
+def _retry_later(entry, batch, error):
+    print("log sink send failed, retrying:", error)
+    entry.pending.extendleft(reversed(batch))
+    entry.backoff_until = time.monotonic() + RETRY_DELAY
+    return False
+
+async def _run():
+    while any(entry.pending for entry in _channels.values()):
+        now = time.monotonic()
+        for entry in list(_channels.values()):
+            if entry.ready(now):
+                if await _send_batch(entry, _take_batch(entry)) and entry.pending:
+                    entry.due = time.monotonic() + FLUSH_DELAY
+
+        now = time.monotonic()
+        waiting = [entry.next_check() for entry in _channels.values() if entry.pending]
+        if not waiting:
+            break
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=max(min(waiting) - now, 0.05))
+        except asyncio.TimeoutError:
+            pass
+
+async def flush():
+    # Sends everything still queued, used on shutdown
+    global _worker
+    if _worker is not None:
+        _worker.cancel()
+        await asyncio.gather(_worker, return_exceptions=True)
+        _worker = None
+    for entry in _channels.values():
+        while entry.pending:
+            if not await _send_batch(entry, _take_batch(entry)):
+                break
@@ -1,10 +1,16 @@
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
-from verify_arcade import send_verify_message_arcade
-from verify_ppy import send_verify_message_ppy
-from essentials_ppy import send_essentials_message
-from ppy_status import track_queue_status
+import http_client
+import verify
+import essentials_ppy
+import jobs
+import startup
+import queue_history
+import link_store
+import hypixel
+import log_sink
+import verify_queue
 import os
 
 load_dotenv()
@@ -16,15 +22,32 @@ class MyBot(commands.Bot):
 
     async def setup_hook(self):
         await self.load_extension("command")
+        # Persistent views keep the panel buttons working across restarts
+        for view in verify.views():
+            self.add_view(view)
+        self.add_view(essentials_ppy.EssentialsButtonView())
 
     async def on_ready(self):
         print(f'Running on "{self.user}"')
-        await self.tree.sync()
-        await send_verify_message_arcade(bot)
-        await send_verify_message_ppy(bot)
-        await send_essentials_message(bot)
-        bot.loop.create_task(track_queue_status(bot))
+        await startup.run(bot)
         print("Bot is ready")
 
+    async def on_member_remove(self, member):
+        # Leaving strips their verified roles, so the link goes with them and
+        # a rejoin is checked against fresh Hypixel data, not what we cached
+        link = link_store.get_link(member.id, member.guild.id)
+        link_store.remove_link(member.id, member.guild.id)
+        if link:
+            hypixel.invalidate_player(link[0])
+
+    async def close(self):
+        await jobs.stop()
+        await verify_queue.stop()
+        await queue_history.flush()
+        await log_sink.flush()
+        await http_client.close()
+        link_store.close()
+        await super().close()
+
 bot = MyBot()
 bot.run(TOKEN)
@@ -0,0 +1,84 @@
+import asyncio
+import re
+import time
+from urllib.parse import quote
+import http_client
+import deadline
+from breaker import CircuitBreaker, register
+from cache import TTLCache, MISSING
+
+PROFILE_URL = "https://api.mojang.com/users/profiles/minecraft/{}"
+# Same answer from a different Mojang service, used for hedged lookups
+ALT_PROFILE_URL = "https://api.minecraftservices.com/minecraft/profile/lookup/name/{}"
+
+PROFILE_CACHE_SIZE = 10000
+PROFILE_TTL = 6 * 60 * 60 # names can be changed, so don't hold them forever
+NOT_FOUND_TTL = 5 * 60
+PROBE_NAME = "Notch" # any name that's guaranteed to exist
+NAME_PATTERN = re.compile(r"[A-Za-z0-9_]{1,16}") # anything else can't be a Minecraft name
+
+# lowercased name -> (uuid, canonical name), or None if the name doesn't exist
+_profiles = TTLCache(PROFILE_CACHE_SIZE, PROFILE_TTL, negative_ttl=NOT_FOUND_TTL)
+
+class MojangUnavailable(Exception):
+    pass
+
+_hedger = http_client.Hedger("mojang")
+
+async def _request(name):
+    # While the circuit is open this fails straight away instead of making
+    # every caller wait out the timeout
+    try:
+        timeout = deadline.timeout("mojang")
+    except deadline.DeadlineExceeded as e:
+        raise MojangUnavailable("out of time for a Mojang lookup") from e
+    if not breaker.allow():
+        raise MojangUnavailable("Mojang API is degraded")
+    started = time.monotonic()
+    try:
+        path = quote(name, safe="")
+        res = await _hedger.get(PROFILE_URL.format(path), timeout=timeout, alternate_url=ALT_PROFILE_URL.format(path))
+    except http_client.RequestError as e:
+        if isinstance(e, asyncio.TimeoutError) and deadline.clipped("mojang", timeout):
+            breaker.release() # our own deadline cut it short, not Mojang's fault
+        else:
+            breaker.record(False)
+        raise MojangUnavailable(str(e) or type(e).__name__) from e
+    except BaseException:
+        breaker.release()
+        raise
+    # A 4xx is Mojang answering about the name we sent, not Mojang failing
+    breaker.record(res.status < 500 and res.status != 429, time.monotonic() - started)
+    return res
+
+async def _probe():
+    await _request(PROBE_NAME)
+
+breaker = register(CircuitBreaker("mojang", probe=_probe))
+
+async def get_profile(name):
+    # Returns (uuid, canonical name), None if the name doesn't exist,
+    # and raises MojangUnavailable if Mojang couldn't tell us either way.
+    key = name.lower()
+    cached = _profiles.get(key)
+    if cached is not MISSING:
+        return cached
+    if not NAME_PATTERN.fullmatch(name):
+        _profiles.set_negative(key)
+        return None
+
+    res = await _request(name)
+    if res.status == 200:
+        data = res.json()
+        profile = (data["id"], data["name"])
+        _profiles.set(key, profile)
+        return profile
+    if res.status == 204 or 400 <= res.status < 500 and res.status != 429:
+        # 404, or a 400 for a name Mojang rejects outright: either way no such player
+        _profiles.set_negative(key)
+        return None
+    raise MojangUnavailable(f"Mojang API returned {res.status}")
+
+async def get_uuid(name):
+    profile = await get_profile(name)
+    return profile[0] if profile else None
@@ -0,0 +1,39 @@
+import hashlib
+import json
+import discord
+import state
+
+def panel_signature(embed, view):
+    payload = {
+        "embed": embed.to_dict(),
+        "buttons": [(getattr(item, "custom_id", None), getattr(item, "label", None)) for item in view.children],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+async def ensure_panel(bot, key, channel, embed, view):
+    # The views are persistent (registered in setup_hook), so an unchanged panel
+    # keeps working as-is and costs one fetch to make sure it's still there.
+    # A changed or missing panel gets (deleted and) reposted.
+    state_key = f"panel:{key}"
+    saved = state.get(state_key, {})
+    signature = panel_signature(embed, view)
+    if saved.get("message_id") and saved.get("signature") == signature:
+        try:
+            await channel.fetch_message(saved["message_id"])
+            return
+        except discord.NotFound:
+            pass # deleted by a mod or lost, post it again below
+
+    if saved.get("message_id"):
+        try:
+            await channel.get_partial_message(saved["message_id"]).delete()
+        except discord.NotFound:
+            pass
+    else:
+        # First run since panels were tracked: clean up the old-style panel
+        async for msg in channel.history(limit=1):
+            if msg.author == bot.user:
+                await msg.delete()
+
+    message = await channel.send(embed=embed, view=view)
+    state.set(state_key, {"message_id": message.id, "signature": signature})
@@ -1,88 +1,160 @@
 import discord
-import asyncio
-import requests
-import os
-from dotenv import load_dotenv
+import time
+import counts_feed
+import jobs
+import state
+import queue_history
 from datetime import datetime, timedelta
 import pytz
 
-load_dotenv()
-API_KEY = os.getenv("HYPIXEL_API_KEY")
-API_URL = "https://api.hypixel.net/counts"
-CHANNEL_ID = 1288528050568302635  
-CHECK_INTERVAL = 10
+# One entry per tracked mode. They all share the same /counts poll.
+QUEUE_TRACKERS = [
+    {
+        "game": "ARCADE",
+        "mode": "PIXEL_PARTY",
+        "threshold": 10,
+        "channel_id": 1288528050568302635,
+        "ping_role_id": 1288413824910753834, # Queue ping
+        "show_rotation": True,
+        "record_history": True,
+    },
+]
+
+# Polling speeds up near the threshold and backs off while the count sits still
+FAST_INTERVAL = 5
+NORMAL_INTERVAL = 15
+SLOW_INTERVAL = 60
+NEAR_MARGIN = 3
+STABLE_POLLS = 6 # polls without movement before slowing down
+
+# A queue has to drop HYSTERESIS players below the threshold to count as dead,
+# and any change has to be seen CONFIRM_POLLS times in a row before we post it
+HYSTERESIS = 2
+CONFIRM_POLLS = 2
+
+COUNT_EDIT_INTERVAL = 60 # seconds between edits that only change the player count
+PING_COOLDOWN = 15 * 60
+PING_LIFETIME = 30 * 60 # old pings are cleaned up so the status message stays on top
 
-last_queue_status = True
-last_rotation_check_date = None
-last_rotation_status = True
 is_currently_in_rotation = True
 
 est = pytz.timezone("US/Eastern")
 
-def get_pixel_party_players():
-    try:
-        response = requests.get(API_URL, params={"key": API_KEY})
-        data = response.json()
-        if data.get("success"):
-            return data["games"]["ARCADE"]["modes"].get("PIXEL_PARTY", 0)
-    except Exception as e:
-        print("error fetching player count:", e)
-    return None
-
 def get_next_rotation_timestamp():
     now_est = datetime.now(est)
     next_midnight_est = (now_est + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
     return int(next_midnight_est.timestamp())
 
-async def update_rotation_daily():
+async def flip_rotation():
     global is_currently_in_rotation
-    while True:
-        now = datetime.now(est)
-        next_midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        seconds_until_midnight = (next_midnight - now).total_seconds()
-        await asyncio.sleep(seconds_until_midnight)
-        is_currently_in_rotation = not is_currently_in_rotation
-
-async def track_queue_status(bot):
-    global last_queue_status, last_rotation_check_date, last_rotation_status
-
-    await bot.wait_until_ready()
-    channel = bot.get_channel(CHANNEL_ID)
-
-    # Start the rotation flipper
-    asyncio.create_task(update_rotation_daily())
-
-    while True:
-        count = get_pixel_party_players()
+    is_currently_in_rotation = not is_currently_in_rotation
+
+class QueueTracker:
+    def __init__(self, bot, game, mode, threshold, channel_id, ping_role_id=None, show_rotation=False, record_history=False):
+        self.bot = bot
+        self.game = game
+        self.mode = mode
+        self.threshold = threshold
+        self.channel_id = channel_id
+        self.ping_role_id = ping_role_id
+        self.show_rotation = show_rotation
+        self.record_history = record_history
+
+        # Survives restarts so a reboot edits the same message and doesn't re-ping
+        self.state_key = f"queue_tracker:{game}:{mode}"
+        saved = state.get(self.state_key, {})
+        self.last_queue_status = saved.get("queueing")
+        self.since = saved.get("since", int(datetime.now().timestamp()))
+        self.message_id = saved.get("message_id")
+        self.last_ping = saved.get("last_ping", 0)
+
+        self.rendered = None
+        self.last_edit = 0.0
+
+        self.last_count = None
+        self.stable_polls = 0
+        self.pending_polls = 0
+
+    def _observe(self, count):
+        # Debounced queue state with hysteresis around the threshold
+        if self.last_queue_status:
+            observed = count >= self.threshold - HYSTERESIS
+        else:
+            observed = count >= self.threshold
+
+        if self.last_queue_status is None:
+            return observed
+        if observed == self.last_queue_status:
+            self.pending_polls = 0
+            return observed
+        self.pending_polls += 1
+        if self.pending_polls >= CONFIRM_POLLS:
+            self.pending_polls = 0
+            return observed
+        return self.last_queue_status
+
+    def _next_interval(self, count):
+        if self.last_count is not None and abs(count - self.last_count) <= 1:
+            self.stable_polls += 1
+        else:
+            self.stable_polls = 0
+        self.last_count = count
+
+        near = self.threshold - HYSTERESIS - NEAR_MARGIN <= count < self.threshold + NEAR_MARGIN
+        if self.pending_polls:
+            return FAST_INTERVAL # a transition is waiting to be confirmed
+        if self.stable_polls >= STABLE_POLLS:
+            # a count sitting still near the threshold doesn't need 5s polls either
+            return NORMAL_INTERVAL if near else SLOW_INTERVAL
+        return FAST_INTERVAL if near else NORMAL_INTERVAL
+
+    async def on_counts(self, counts):
+        count = counts_feed.mode_count(counts, self.game, self.mode)
         if count is None:
-            await asyncio.sleep(CHECK_INTERVAL)
-            continue
-
-        is_queueing = count >= 10
-        now_unix = int(datetime.now().timestamp())
+            return None
+
+        is_queueing = self._observe(count)
+        interval = self._next_interval(count)
+        if self.record_history:
+            queue_history.record(count, is_queueing)
+        if is_queueing != self.last_queue_status:
+            changed_to_queueing = is_queueing and self.last_queue_status is not None
+            self.last_queue_status = is_queueing
+            self.since = int(datetime.now().timestamp())
+            self._save()
+            if changed_to_queueing:
+                await self._notify()
+
+        await self._update_message(count)
+        return interval
+
+    def _save(self):
+        state.set(self.state_key, {
+            "queueing": self.last_queue_status,
+            "since": self.since,
+            "message_id": self.message_id,
+            "last_ping": self.last_ping,
+        })
+
+    def _render(self, count):
+        is_queueing = self.last_queue_status
         rotation_now = is_currently_in_rotation
         rotation_change_ts = get_next_rotation_timestamp()
 
-        should_update = (last_queue_status != is_queueing) or (last_rotation_check_date != datetime.now(est).date())
-
-        if should_update:
-            last_queue_status = is_queueing
-            last_rotation_check_date = datetime.now(est).date()
-            last_rotation_status = rotation_now
-
-            color_dot = "🟢" if is_queueing else "🔴"
-            rotation_dot = "🟢" if rotation_now else "🔴"
-
-            embed = discord.Embed(
-                title="Queue Status Update",
-                color=0x00FF00 if is_queueing else 0xFF0000
-            )
-            embed.description = (
-                f"The game is currently queueing. {color_dot} (<t:{now_unix}:R>)"
-                if is_queueing else
-                f"The game is **not** currently queueing. {color_dot} (<t:{now_unix}:R>)"
-            )
-            embed.add_field(name="**Current playercount**", value=f"{count}", inline=False)
+        color_dot = "🟢" if is_queueing else "🔴"
+        rotation_dot = "🟢" if rotation_now else "🔴"
+
+        embed = discord.Embed(
+            title="Queue Status",
+            color=0x00FF00 if is_queueing else 0xFF0000
+        )
+        embed.description = (
+            f"The game is currently queueing. {color_dot} (<t:{self.since}:R>)"
+            if is_queueing else
+            f"The game is **not** currently queueing. {color_dot} (<t:{self.since}:R>)"
+        )
+        embed.add_field(name="**Current playercount**", value=f"{count}", inline=False)
+        if self.show_rotation:
             embed.add_field(
                 name="**Rotation Status**",
                 value=f"In Rotation {rotation_dot} (Changes <t:{rotation_change_ts}:R>)"
@@ -90,15 +162,60 @@ async def track_queue_status(bot):
                 f"Not In Rotation {rotation_dot} (Changes <t:{rotation_change_ts}:R>)",
                 inline=False
             )
-            embed.set_footer(text=(
-                "A notification will be sent immediately when the queue has died."
-                if is_queueing else
-                "A notification will be sent immediately when the game is queueing again."
-            ))
-
-            if is_queueing:
-                await channel.send("<@&1288413824910753834>") # Queue ping
-
-            await channel.send(embed=embed)
-
-        await asyncio.sleep(CHECK_INTERVAL)
+        embed.set_footer(text=(
+            "A notification will be sent immediately when the queue has died."
+            if is_queueing else
+            "A notification will be sent immediately when the game is queueing again."
+        ))
+        return embed
+
+    async def _update_message(self, count):
+        # Status and rotation changes are edited in right away; a count that
+        # merely moved waits for COUNT_EDIT_INTERVAL so we don't edit every poll.
+        key = (self.last_queue_status, self.since, is_currently_in_rotation, self.show_rotation and get_next_rotation_timestamp())
+        if self.rendered is not None:
+            old_key, old_count = self.rendered
+            if old_key == key and (old_count == count or time.monotonic() - self.last_edit < COUNT_EDIT_INTERVAL):
+                return
+
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None:
+            return
+
+        embed = self._render(count)
+        if self.message_id:
+            try:
+                await channel.get_partial_message(self.message_id).edit(content=None, embed=embed)
+            except discord.NotFound:
+                self.message_id = None
+        if not self.message_id:
+            message = await channel.send(embed=embed)
+            self.message_id = message.id
+            self._save()
+
+        self.rendered = (key, count)
+        self.last_edit = time.monotonic()
+
+    async def _notify(self):
+        # Pings are their own messages so the status message can stay put
+        if not self.ping_role_id or time.time() - self.last_ping < PING_COOLDOWN:
+            return
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None:
+            return
+        self.last_ping = time.time()
+        self._save()
+        await channel.send(f"<@&{self.ping_role_id}>", delete_after=PING_LIFETIME)
+
+_trackers = []
+
+def setup_queue_tracking(bot):
+    if not _trackers:
+        for tracker_config in QUEUE_TRACKERS:
+            tracker = QueueTracker(bot, **tracker_config)
+            counts_feed.subscribe(tracker.on_counts)
+            _trackers.append(tracker)
+
+    jobs.daily("rotation_flip", flip_rotation, tz=est)
+    jobs.every("counts_poll", counts_feed.POLL_INTERVAL, counts_feed.poll_job)
+    jobs.every("queue_history_save", queue_history.SAVE_INTERVAL, queue_history.flush, first_delay=queue_history.SAVE_INTERVAL)
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import time
+from array import array
+
+HISTORY_FILE = "queue_history.bin"
+SAVE_INTERVAL = 300 # seconds between flushes to disk
+
+class Tier:
+    # Fixed-size ring of time buckets. Each slot keeps the aggregates for one
+    # bucket, so queries read at most `capacity` slots no matter how many
+    # samples went in.
+    FIELDS = ("bucket", "low", "high", "total", "samples", "queueing")
+
+    def __init__(self, name, resolution, capacity):
+        self.name = name
+        self.resolution = resolution
+        self.capacity = capacity
+        self.bucket = array("q", [-1]) * capacity
+        self.low = array("l", [0]) * capacity
+        self.high = array("l", [0]) * capacity
+        self.total = array("q", [0]) * capacity
+        self.samples = array("l", [0]) * capacity
+        self.queueing = array("l", [0]) * capacity
+
+    def add(self, ts, count, is_queueing):
+        b = int(ts) // self.resolution
+        i = b % self.capacity
+        if self.bucket[i] != b:
+            self.bucket[i] = b
+            self.low[i] = self.high[i] = count
+            self.total[i] = self.samples[i] = self.queueing[i] = 0
+        self.low[i] = min(self.low[i], count)
+        self.high[i] = max(self.high[i], count)
+        self.total[i] += count
+        self.samples[i] += 1
+        self.queueing[i] += 1 if is_queueing else 0
+
+    def buckets(self, start, end):
+        # (bucket start ts, low, high, total, samples, queueing) for every
+        # bucket in [start, end] that has data, oldest first
+        first = int(start) // self.resolution
+        last = int(end) // self.resolution
+        first = max(first, last - self.capacity + 1)
+        out = []
+        for b in range(first, last + 1):
+            i = b % self.capacity
+            if self.bucket[i] == b:
+                out.append((b * self.resolution, self.low[i], self.high[i], self.total[i], self.samples[i], self.queueing[i]))
+        return out
+
+    def write(self, f):
+        for field in self.FIELDS:
+            getattr(self, field).tofile(f)
+
+    def read(self, f):
+        for field in self.FIELDS:
+            arr = array(getattr(self, field).typecode)
+            arr.fromfile(f, self.capacity)
+            setattr(self, field, arr)
+
+TIERS = [
+    Tier("raw", 10, 360), # last hour at poll resolution
+    Tier("minute", 60, 7 * 24 * 60), # last week
+    Tier("hour", 3600, 90 * 24), # last ~3 months
+]
+
+_loaded = False
+
+def _load():
+    global _loaded
+    _loaded = True
+    try:
+        with open(HISTORY_FILE, "rb") as f:
+            for tier in TIERS:
+                tier.read(f)
+    except FileNotFoundError:
+        pass
+    except (EOFError, ValueError) as e:
+        # Layout changed or file got cut off; start over rather than crash
+        print("queue history unreadable, starting fresh:", e)
+        for i, tier in enumerate(TIERS):
+            TIERS[i] = Tier(tier.name, tier.resolution, tier.capacity)
+
+def save():
+    directory = os.path.dirname(os.path.abspath(HISTORY_FILE))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for tier in TIERS:
+                tier.write(f)
+        os.replace(tmp_path, HISTORY_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def record(count, is_queueing, ts=None):
+    if not _loaded:
+        _load()
+    ts = time.time() if ts is None else ts
+    for tier in TIERS:
+        tier.add(ts, count, is_queueing)
+
+async def flush():
+    if _loaded:
+        save()
+
+def pick_tier(seconds, min_points=24):
+    # Coarsest tier that still gives a readable amount of points
+    for tier in reversed(TIERS):
+        if seconds // tier.resolution >= min_points:
+            return tier
+    return TIERS[0]
+
+def summarize(seconds, points=24, now=None):
+    # Returns (peak, average, share of samples spent queueing, [avg per chunk])
+    # or None if nothing was recorded in the period.
+    if not _loaded:
+        _load()
+    now = time.time() if now is None else now
+    tier = pick_tier(seconds, points)
+    buckets = tier.buckets(now - seconds, now)
+    if not buckets:
+        return None
+
+    total = sum(b[3] for b in buckets)
+    samples = sum(b[4] for b in buckets)
+    queueing = sum(b[5] for b in buckets)
+    peak = max(b[2] for b in buckets)
+
+    chunk = seconds / points
+    start = now - seconds
+    series = [None] * points
+    sums = [0] * points
+    counts = [0] * points
+    for b in buckets:
+        i = min(points - 1, max(0, int((b[0] - start) // chunk)))
+        sums[i] += b[3]
+        counts[i] += b[4]
+    for i in range(points):
+        if counts[i]:
+            series[i] = sums[i] / counts[i]
+    return peak, total / samples, queueing / samples, series
+
+def sparkline(series):
+    blocks = "▁▂▃▄▅▆▇█"
+    values = [v for v in series if v is not None]
+    if not values:
+        return ""
+    low, top = min(values), max(values)
+    span = (top - low) or 1
+    return "".join(" " if v is None else blocks[int((v - low) / span * (len(blocks) - 1))] for v in series)
@@ -0,0 +1,157 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+# Lower number = served first
+PRIORITY_VERIFY = 0
+PRIORITY_INTERACTIVE = 1 # /stats, /compare, essentials buttons
+PRIORITY_BACKGROUND = 2 # queue polling, role sync
+
+DEFAULT_LIMIT = 300 # Hypixel's default per-key limit per window
+DEFAULT_WINDOW = 300 # seconds
+BURST = 10
+RETRY_AFTER_DEFAULT = 60
+
+# Share of the window's quota each priority must leave untouched for the
+# ones above it. Verification can spend the budget down to zero.
+RESERVE = {
+    PRIORITY_VERIFY: 0.0,
+    PRIORITY_INTERACTIVE: 0.05,
+    PRIORITY_BACKGROUND: 0.25,
+}
+
+class Ticket:
+    # A place in the queue that can be moved up while it waits, for requests
+    # shared by several callers when a more urgent one joins late
+    def __init__(self, priority):
+        self.priority = priority
+        self.fut = None
+
+def _header_int(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+class RateLimiter:
+    # Token bucket paced by Hypixel's RateLimit-* headers. Requests wait in a
+    # priority queue and are released in priority order as tokens come in.
+    def __init__(self, limit=DEFAULT_LIMIT, window=DEFAULT_WINDOW, burst=BURST):
+        self.limit = limit
+        self.window = window
+        self.burst = burst
+        self.tokens = float(burst)
+        self.rate = limit / window
+        self.remaining = limit
+        self.reset_at = time.monotonic() + window
+        self.blocked_until = 0.0
+        self.inflight = 0 # granted but no headers seen yet
+        self._updated = time.monotonic()
+        self._queue = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher = None
+
+    def _refill(self):
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+            self.rate = self.limit / self.window
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _can_grant(self, priority):
+        if time.monotonic() < self.blocked_until or self.tokens < 1:
+            return False
+        return self.remaining > self.limit * RESERVE.get(priority, 0.0)
+
+    def _delay(self, priority):
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.remaining <= self.limit * RESERVE.get(priority, 0.0):
+            return max(0.0, self.reset_at - now)
+        return max(0.0, (1 - self.tokens) / self.rate) if self.rate else 1.0
+
+    async def _dispatch(self):
+        while self._queue:
+            self._refill()
+            priority, _, fut = self._queue[0]
+            if fut.done(): # caller gave up
+                heapq.heappop(self._queue)
+                continue
+            if self._can_grant(priority):
+                heapq.heappop(self._queue)
+                self.tokens -= 1
+                self.remaining -= 1
+                self.inflight += 1
+                fut.set_result(None)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(self._delay(priority), 0.01))
+            except asyncio.TimeoutError:
+                pass
+        self._dispatcher = None
+
+    async def acquire(self, priority=PRIORITY_INTERACTIVE, ticket=None):
+        fut = asyncio.get_running_loop().create_future()
+        if ticket is not None:
+            priority = ticket.priority
+            ticket.fut = fut
+        heapq.heappush(self._queue, (priority, next(self._seq), fut))
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        else:
+            self._wakeup.set() # a higher priority request may now be at the head
+        await fut
+
+    def promote(self, ticket, priority):
+        # The old heap entry stays behind; whichever entry is granted first
+        # resolves the future and the dispatcher drops the other as done
+        if priority >= ticket.priority:
+            return
+        ticket.priority = priority
+        if ticket.fut is not None and not ticket.fut.done():
+            heapq.heappush(self._queue, (priority, next(self._seq), ticket.fut))
+            self._wakeup.set()
+
+    def release(self):
+        # For requests that never got a response (timeouts, connection errors)
+        self.inflight = max(0, self.inflight - 1)
+        self._wakeup.set()
+
+    def update(self, headers, status=200):
+        self.inflight = max(0, self.inflight - 1)
+        self._refill()
+        now = time.monotonic()
+        limit = _header_int(headers, "RateLimit-Limit")
+        remaining = _header_int(headers, "RateLimit-Remaining")
+        reset = _header_int(headers, "RateLimit-Reset")
+
+        if limit:
+            self.limit = limit
+        if reset is not None:
+            self.reset_at = now + reset
+        if remaining is not None:
+            self.remaining = max(0, remaining - self.inflight)
+            # spread what's left evenly over the rest of the window
+            self.rate = remaining / max(reset or self.window, 1)
+            if remaining <= 0:
+                self.tokens = 0
+                self.blocked_until = max(self.blocked_until, self.reset_at)
+
+        if status == 429:
+            retry_after = _header_int(headers, "Retry-After") or reset or RETRY_AFTER_DEFAULT
+            self.tokens = 0
+            self.remaining = 0
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            if reset is None:
+                # otherwise the quota comes back at the old reset, which may
+                # be long after Hypixel told us to try again
+                self.reset_at = now + retry_after
+        self._wakeup.set()
+
+hypixel_limiter = RateLimiter()
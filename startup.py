@@ -0,0 +1,86 @@
+import asyncio
+import hashlib
+import json
+import time
+import discord
+import state
+import jobs
+import breaker
+import verify
+from essentials_ppy import send_essentials_message
+from ppy_status import setup_queue_tracking
+from win_sync import setup_win_sync
+
+COMMAND_GUILD_IDS = [
+    730247359732383774, # Arcade
+    900845277311815701, # PPY
+]
+
+timings = {} # phase -> seconds, from the last startup
+_started = False
+
+def command_signature(tree, guild=None):
+    commands = sorted(tree.get_commands(guild=guild), key=lambda c: c.name)
+    payload = json.dumps([c.to_dict(tree) for c in commands], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+async def sync_commands(bot):
+    # Discord only allows a handful of syncs a day, so skip any scope whose
+    # command tree hasn't changed since the last successful sync
+    scopes = [None] + [discord.Object(id=guild_id) for guild_id in COMMAND_GUILD_IDS]
+    synced = []
+    for guild in scopes:
+        key = f"command_hash:{guild.id if guild else 'global'}"
+        signature = command_signature(bot.tree, guild)
+        if state.get(key) == signature:
+            continue
+        await bot.tree.sync(guild=guild)
+        state.set(key, signature)
+        synced.append(guild.id if guild else "global")
+    return synced
+
+async def post_panels(bot):
+    results = await asyncio.gather(
+        *(verify.send_verify_message(bot, guild_id) for guild_id in verify.VERIFY_GUILDS),
+        send_essentials_message(bot),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print("error posting panel:", result)
+
+def start_jobs(bot):
+    setup_queue_tracking(bot)
+    setup_win_sync(bot)
+    jobs.every("service_probe", breaker.PROBE_INTERVAL, breaker.probe_job, first_delay=breaker.PROBE_INTERVAL)
+    jobs.start()
+
+async def _phase(name, coro):
+    started = time.monotonic()
+    try:
+        return await coro
+    finally:
+        timings[name] = time.monotonic() - started
+        print(f"startup: {name} took {timings[name]:.2f}s")
+
+async def run(bot):
+    # on_ready fires again after every gateway reconnect; only start up once
+    global _started
+    if _started:
+        return
+    _started = True
+
+    started = time.monotonic()
+    commands_task = _phase("command sync", sync_commands(bot))
+    panels_task = _phase("panels", post_panels(bot))
+    synced, _ = await asyncio.gather(commands_task, panels_task, return_exceptions=True)
+    if isinstance(synced, Exception):
+        print("error syncing commands:", synced)
+    elif synced:
+        print("synced commands for:", ", ".join(map(str, synced)))
+
+    started_jobs = time.monotonic()
+    start_jobs(bot)
+    timings["jobs"] = time.monotonic() - started_jobs
+    timings["total"] = time.monotonic() - started
+    print(f"startup: done in {timings['total']:.2f}s")
@@ -0,0 +1,43 @@
+import json
+import os
+import stat
+import tempfile
+
+STATE_FILE = "bot_state.json"
+
+_state = None
+
+def write_json_atomic(path, data):
+    # Write to a temp file next to the target and swap it in, so a crash
+    # mid-write never leaves a truncated file behind
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        # mkstemp creates the file 0600, keep whatever mode the target had
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _load():
+    global _state
+    if _state is None:
+        try:
+            with open(STATE_FILE, "r") as f:
+                _state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _state = {}
+    return _state
+
+def get(key, default=None):
+    return _load().get(key, default)
+
+def set(key, value):
+    data = _load()
+    data[key] = value
+    write_json_atomic(STATE_FILE, data)
@@ -0,0 +1,343 @@
+import discord
+import math
+import time
+import hypixel
+import mojang
+import rate_limit
+import log_sink
+import failures
+from cache import MISSING
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+# What a rule has to fetch before it can decide. Rules run cheapest first,
+# so a rejection on local data never spends Mojang or Hypixel quota.
+COST_LOCAL = 0
+COST_MOJANG = 1
+COST_HYPIXEL = 2
+
+def calculate_hypixel_level(network_exp):
+    return max(1, round((math.sqrt(network_exp + 15312.5) - 125 / math.sqrt(2)) / (25 * math.sqrt(2)), 2)) # Hypixel level formula
+
+class Rejection(NamedTuple):
+    reason: str
+    embed: discord.Embed = None
+    log_embed: discord.Embed = None
+    content: str = None
+    retryable: bool = False # the API was busy, not the player's fault
+
+RETRY = object() # returned by run() when a retryable rejection should be retried later
+
+class Context:
+    # Everything the rules learn about one attempt; later rules read what
+    # earlier ones fetched.
+    def __init__(self, interaction, ign, requirements):
+        self.interaction = interaction
+        self.user = interaction.user
+        self.ign = ign
+        self.requirements = requirements
+        self.now = datetime.now(timezone.utc)
+        self.created_at = interaction.user.created_at
+        self.account_age = None
+        self.uuid = None
+        self.mc_name = None
+        self.snapshot = None
+        self.hypixel_level = None
+        self.first_login = None
+
+class RuleStats:
+    def __init__(self):
+        self.runs = 0
+        self.rejections = 0
+        self.total_time = 0.0
+
+    @property
+    def avg_ms(self):
+        return self.total_time / self.runs * 1000 if self.runs else 0.0
+
+stats = {} # rule name -> RuleStats, since startup
+
+def _reply(title, description, footer):
+    embed = discord.Embed(title=title, description=description, color=discord.Color.red())
+    embed.set_footer(text=f"Verification Failed • {footer}")
+    return embed
+
+def _degraded(service):
+    # Answered straight away while the service's circuit is open
+    embed = discord.Embed(
+        title="Service Degraded",
+        description=(
+            f"The {service} API is having problems right now, so verification is paused.\n"
+            "Please try again in a few minutes."
+        ),
+        color=discord.Color.orange()
+    )
+    embed.set_footer(text=f"Verification Failed • {service} API Degraded")
+    return embed
+
+def _log(ctx, title, reason, fields=(), color=None):
+    log_embed = discord.Embed(title=title, color=color or discord.Color.red())
+    log_embed.add_field(name="User", value=f"{ctx.user} ({ctx.user.id})", inline=False)
+    log_embed.add_field(name="Attempted IGN", value=ctx.ign, inline=True)
+    for name, value in fields:
+        log_embed.add_field(name=name, value=value, inline=True)
+    log_embed.add_field(name="Reason", value=reason, inline=False)
+    log_embed.set_footer(text="Verification Logger")
+    return log_embed
+
+def _no_hypixel_account(name, ctx):
+    return Rejection(
+        name,
+        _reply(
+            "Hypixel Account Not Found",
+            f"The account `{ctx.ign}` exists but hasn't joined Hypixel yet, or the data couldn't be retrieved.\n"
+            "Make sure the account has logged into Hypixel at least once.",
+            "No Hypixel Data"
+        ),
+        _log(ctx, "Verification Error: No Hypixel Account", "No `player` field in Hypixel API response — likely never joined Hypixel")
+    )
+
+def _no_discord_link(name, ctx):
+    return Rejection(
+        name,
+        _reply(
+            "No Discord Linked on Hypixel",
+            f"The Minecraft account `{ctx.ign}` does not have a Discord account linked on Hypixel.\n"
+            "Please join Hypixel and link your Discord.",
+            "Missing Discord Link"
+        ),
+        _log(ctx, "Verification Error: Missing Discord Link", "No Discord account linked on Hypixel profile")
+    )
+
+def _tag_mismatch(name, ctx, linked_discord):
+    user_tag = str(ctx.user)
+    return Rejection(
+        name,
+        _reply(
+            "Discord Tag Mismatch",
+            f"The Discord account linked to `{ctx.ign}` on Hypixel does not match your current tag.\n\n"
+            f"**Linked on Hypixel:** `{linked_discord}`\n"
+            f"**Your Discord tag:** `{user_tag}`\n\n"
+            "To fix this, join Hypixel and link the correct Discord account.",
+            "Tag Mismatch"
+        ),
+        _log(ctx, "Verification Error: Discord Tag Mismatch", "Mismatch between user's Discord tag and what is linked on Hypixel", [
+            ("Linked Discord", linked_discord or "None"),
+            ("User's Discord Tag", user_tag),
+        ])
+    )
+
+class DiscordAgeRule:
+    name = "discord_age"
+    cost = COST_LOCAL
+
+    async def check(self, ctx):
+        if not ctx.created_at:
+            return Rejection(
+                self.name,
+                _reply(
+                    "Unable to Verify Discord Account Age",
+                    "We couldn't determine the creation date of your Discord account.\n"
+                    "Please try again later or contact an admin if this issue persists.",
+                    "Missing Account Date"
+                ),
+                _log(ctx, "Verification Error: Discord Account Age Unknown", "Discord `created_at` is None (couldn't determine account age)")
+            )
+
+        ctx.account_age = ctx.now - ctx.created_at
+        if ctx.account_age < ctx.requirements.discord_age:
+            return Rejection(
+                self.name,
+                _reply(
+                    "Discord Account Too New",
+                    f"Your Discord account must be at least `{ctx.requirements.least_discord_account_age}` old to verify.\n"
+                    f"Current age: `{ctx.account_age.days}` days.",
+                    "Discord Account Age Too Low"
+                ),
+                _log(ctx, "Verification Error: Discord Account Too New", "Discord account age does not meet requirement", [
+                    ("Account Age", f"{ctx.account_age.days} days"),
+                    ("Required Age", ctx.requirements.least_discord_account_age),
+                ])
+            )
+
+class MojangNameRule:
+    name = "mojang_name"
+    cost = COST_MOJANG
+
+    async def check(self, ctx):
+        try:
+            profile = await mojang.get_profile(ctx.ign)
+        except mojang.MojangUnavailable:
+            if mojang.breaker.is_open:
+                return Rejection(self.name, _degraded("Mojang"))
+            return Rejection(self.name, content="❌ Mojang API is currently not responding. Try again in a bit.", retryable=True)
+        if profile is None:
+            log_embed = discord.Embed(title="Verification Attempt Failed", color=discord.Color.red())
+            log_embed.add_field(name="User", value=f"{ctx.user} (`{ctx.user.id}`)", inline=False)
+            log_embed.add_field(name="Entered Username", value=ctx.ign, inline=False)
+            log_embed.add_field(name="Reason", value="Invalid Minecraft username", inline=False)
+            log_embed.set_footer(text="System Log")
+            return Rejection(
+                self.name,
+                _reply(
+                    "Minecraft Username Invalid",
+                    f"The username `{ctx.ign}` could not be found.\n"
+                    "Please make sure it's typed correctly and that the account exists.",
+                    "Invalid Username"
+                ),
+                log_embed
+            )
+        ctx.uuid, ctx.mc_name = profile
+
+class RecentFailureRule:
+    # Answers a retry of a recently failed account from memory instead of
+    # asking Hypixel again; see failures.REASON_TTL
+    name = "recent_failure"
+    cost = COST_MOJANG
+
+    async def check(self, ctx):
+        if failures.recall("no_hypixel_account", ctx.uuid) is not MISSING:
+            return _no_hypixel_account(self.name, ctx)
+        if failures.recall("no_discord_link", ctx.uuid) is not MISSING:
+            return _no_discord_link(self.name, ctx)
+        linked_discord = failures.recall("tag_mismatch", ctx.uuid)
+        if linked_discord is not MISSING and linked_discord != str(ctx.user):
+            return _tag_mismatch(self.name, ctx, linked_discord)
+
+class HypixelPresenceRule:
+    name = "hypixel_presence"
+    cost = COST_HYPIXEL
+
+    async def check(self, ctx):
+        try:
+            ctx.snapshot = await hypixel.get_snapshot(ctx.uuid, max_age=hypixel.LINK_CHECK_MAX_AGE, priority=rate_limit.PRIORITY_VERIFY)
+        except hypixel.HypixelUnavailable:
+            if hypixel.breaker.is_open:
+                return Rejection(self.name, _degraded("Hypixel"))
+            ctx.snapshot = None
+        if ctx.snapshot is None:
+            embed = discord.Embed(
+                title="Hypixel API Error",
+                description=(
+                    "I'm currently being rate-limited.\n"
+                    "Please wait at least 2 minutes before trying again.\n"
+                ),
+                color=discord.Color.orange()
+            )
+            embed.set_footer(text="Verification Failed • Hypixel API Issue")
+            return Rejection(
+                self.name,
+                embed,
+                _log(ctx, "Verification Error: Hypixel API Unavailable", "Hypixel API is on cooldown. The user needs to wait atleast 2 minutes before trying again.", color=discord.Color.orange()),
+                retryable=True
+            )
+
+        failures.remember_snapshot(ctx.snapshot, str(ctx.user))
+        if not ctx.snapshot.exists:
+            return _no_hypixel_account(self.name, ctx)
+
+class DiscordLinkRule:
+    name = "discord_link"
+    cost = COST_HYPIXEL
+
+    async def check(self, ctx):
+        linked_discord = ctx.snapshot.linked_discord
+        if not linked_discord:
+            return _no_discord_link(self.name, ctx)
+        if linked_discord != str(ctx.user):
+            return _tag_mismatch(self.name, ctx, linked_discord)
+
+class HypixelLevelRule:
+    name = "hypixel_level"
+    cost = COST_HYPIXEL
+
+    async def check(self, ctx):
+        ctx.hypixel_level = calculate_hypixel_level(ctx.snapshot.network_exp)
+        required = ctx.requirements.least_hypixel_level
+        if ctx.hypixel_level < required:
+            return Rejection(
+                self.name,
+                _reply(
+                    "Insufficient Hypixel Level",
+                    f"Your Hypixel level is `{int(ctx.hypixel_level)}`, but the minimum required level is `{required}`.\n"
+                    "Keep playing on Hypixel to level up, then try verifying again later.",
+                    "Hypixel Level Too Low"
+                ),
+                _log(ctx, "Verification Error: Hypixel Level Too Low", "Hypixel level does not meet requirement", [
+                    ("Level", f"{int(ctx.hypixel_level)}"),
+                    ("Required Level", f"{required}"),
+                ])
+            )
+
+class HypixelAgeRule:
+    name = "hypixel_age"
+    cost = COST_HYPIXEL
+
+    async def check(self, ctx):
+        ctx.first_login = ctx.snapshot.first_login
+        if ctx.first_login is None:
+            return Rejection(
+                self.name,
+                _reply(
+                    "Unable to Verify Hypixel Account Age",
+                    "We couldn't determine when this account first joined Hypixel.\n"
+                    "Please ensure the account has logged into Hypixel at least once and try again later.",
+                    "Missing Join Date"
+                ),
+                _log(ctx, "Verification Error: Missing Hypixel Join Date", "No `firstLogin` timestamp in Hypixel data")
+            )
+
+        first_login_date = datetime.fromtimestamp(ctx.first_login / 1000, timezone.utc)
+        age = ctx.now - first_login_date
+        if age < ctx.requirements.hypixel_age:
+            return Rejection(
+                self.name,
+                _reply(
+                    "Hypixel Account Too New",
+                    f"Your Hypixel account must be at least `{ctx.requirements.least_hypixel_account_age}` old to verify.\n"
+                    f"Current age: `{age.days}` days.",
+                    "Account Age Too Low"
+                ),
+                _log(ctx, "Verification Error: Hypixel Account Too New", "Hypixel account age does not meet requirement", [
+                    ("Account Age", f"{age.days} days"),
+                    ("Required Age", ctx.requirements.least_hypixel_account_age),
+                ])
+            )
+
+# Listed in dependency order; the sort below keeps that order within a cost.
+# Thresholds come from ctx.requirements at check time, so one ordering
+# serves every guild and config.
+RULES = [DiscordAgeRule, MojangNameRule, RecentFailureRule, HypixelPresenceRule, DiscordLinkRule, HypixelLevelRule, HypixelAgeRule]
+
+_ordered_rules = sorted((rule() for rule in RULES), key=lambda rule: rule.cost)
+
+async def _followup(interaction, content=None, embed=None):
+    await interaction.followup.send(content, embed=embed, ephemeral=True)
+
+async def run(interaction, ign, requirements, log_channel, reply=None, can_retry=False):
+    # Runs the rules and answers the user on the first rejection. Returns
+    # the filled-in Context if every rule passed, RETRY if the caller asked
+    # to retry API hiccups itself, otherwise None.
+    # reply(content=None, embed=None) sends the answer, a followup by default.
+    if reply is None:
+        reply = lambda content=None, embed=None: _followup(interaction, content, embed)
+    ctx = Context(interaction, ign, requirements)
+    for rule in _ordered_rules:
+        rule_stats = stats.setdefault(rule.name, RuleStats())
+        started = time.perf_counter()
+        try:
+            rejection = await rule.check(ctx)
+        finally:
+            rule_stats.runs += 1
+            rule_stats.total_time += time.perf_counter() - started
+        if rejection is None:
+            continue
+        if rejection.retryable and can_retry:
+            return RETRY
+
+        rule_stats.rejections += 1
+        await reply(content=rejection.content, embed=rejection.embed)
+        if rejection.log_embed is not None:
+            log_sink.send(log_channel, rejection.log_embed)
+        return None
+    return ctx
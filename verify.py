@@ -0,0 +1,177 @@
+import discord
+from win_roles import reconcile_win_roles
+import link_store
+import config
+import verification
+import panels
+import log_sink
+import verify_queue
+import deadline
+from datetime import datetime, timezone
+
+# One entry per community. Everything guild specific lives here; adding a
+# server means adding an entry plus its requirements section in values.json.
+VERIFY_GUILDS = {
+    900845277311815701: {
+        "key": "ppy", # custom_id and panel state prefix, keep stable
+        "name": "Pixel Party Community",
+        "server": "PPY_COMMUNITY", # section in values.json
+        "verify_channel_id": 1131646078790406284,
+        "log_channel_id": 1131681873123356682,
+        "guide_channel_id": 907232971067654155,
+        "remove_role_id": 903769123471900732,
+        "add_role_ids": [903547723918229534, 900847332617228338],
+        "win_roles": True,
+        "set_nickname": True,
+    },
+    730247359732383774: {
+        "key": "arcade",
+        "name": "Arcade Community",
+        "server": "ARCADE_COMMUNITY",
+        "verify_channel_id": 1280504049296212019,
+        "log_channel_id": 1280496170007003157,
+        "guide_channel_id": 1280501619145969947,
+        "remove_role_id": 919007428157243402,
+        "add_role_ids": [779183391764643890],
+        "win_roles": False,
+        "set_nickname": False,
+    },
+}
+
+async def apply_roles(member, settings, wins):
+    if settings["win_roles"]:
+        # Verified roles and win roles go out in a single member edit
+        await reconcile_win_roles(member, wins, add=settings["add_role_ids"], remove=[settings["remove_role_id"]])
+        return
+    await member.remove_roles(discord.Object(id=settings["remove_role_id"]))
+    await member.add_roles(*(discord.Object(id=role_id) for role_id in settings["add_role_ids"]))
+
+class VerifyModal(discord.ui.Modal, title="Verify your Minecraft account"):
+    minecraft_username = discord.ui.TextInput(label="Minecraft Username", placeholder="e.g. Notch")
+
+    def __init__(self, guild_id):
+        super().__init__()
+        self.guild_id = guild_id
+
+    async def on_submit(self, interaction: discord.Interaction):
+        # thinking=True gives us an ephemeral message of our own to edit
+        # with the queue position and later the result
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        ign = self.minecraft_username.value
+        guild_id = self.guild_id
+
+        async def work(reply, can_retry):
+            with deadline.scope(deadline.VERIFY_BUDGET):
+                return await process(interaction, guild_id, ign, reply, can_retry)
+
+        await verify_queue.submit((guild_id, interaction.user.id), interaction, work)
+
+async def process(interaction, guild_id, ign, reply, can_retry=False):
+    # Returns False when the APIs were busy and the attempt should be retried
+    settings = VERIFY_GUILDS[guild_id]
+    requirements = config.get_requirements(settings["server"])
+    guild = interaction.guild
+    log_channel = guild.get_channel(settings["log_channel_id"])
+
+    # Local checks run before anything that costs API quota
+    result = await verification.run(interaction, ign, requirements, log_channel, reply=reply, can_retry=can_retry)
+    if result is verification.RETRY:
+        return False
+    if result is None:
+        return True
+
+    uuid, mc_name, snapshot = result.uuid, result.mc_name, result.snapshot
+    created_at, first_login, hypixel_level = result.created_at, result.first_login, result.hypixel_level
+    member = guild.get_member(interaction.user.id)
+
+    if member:
+        link_store.save_link(member.id, guild.id, uuid, mc_name)
+        try:
+            await deadline.wait_for(apply_roles(member, settings, snapshot.pixel_party_wins), "discord")
+        except deadline.DeadlineExceeded:
+            await reply(content="❌ Discord didn't apply your roles in time. Please press Verify again.")
+            return True
+
+        if settings["set_nickname"]:
+            try:
+                await deadline.wait_for(member.edit(nick=ign), "discord")
+            except (discord.Forbidden, deadline.DeadlineExceeded):
+                pass
+
+        await reply(content=f"✅ You’ve been verified as `{ign}`!")
+    else:
+        await reply(content="❌ Couldn't find you in this server. Are you still in it?")
+
+    if log_channel:
+        # data prep
+        first_login_str = (
+            datetime.utcfromtimestamp(first_login / 1000).strftime("%Y-%m-%d %H:%M:%S UTC")
+            if first_login else "Unknown"
+        )
+        discord_creation = created_at.strftime("%Y-%m-%d %H:%M:%S UTC")
+        account_age_days = (datetime.now(timezone.utc) - created_at).days
+        hypixel_level_display = round(hypixel_level, 2)
+        avatar_url = f"https://minotar.net/helm/{uuid}/100"
+
+        embed = discord.Embed(
+            title="✅ New Verification Logged",
+            description=f"User `{interaction.user}` has successfully verified as `{ign}`.",
+            color=discord.Color.green()
+        )
+        embed.set_thumbnail(url=avatar_url)
+
+        embed.add_field(name="Minecraft IGN", value=ign, inline=False)
+        embed.add_field(name="UUID", value=uuid, inline=False)
+        embed.add_field(name="Hypixel Level", value=f"{hypixel_level_display}", inline=False)
+        embed.add_field(name="First Hypixel Join", value=first_login_str, inline=False)
+        embed.add_field(name="Discord Tag", value=str(interaction.user), inline=False)
+        embed.add_field(name="Discord ID", value=interaction.user.id, inline=False)
+        embed.add_field(name="Discord Created", value=discord_creation, inline=False)
+        embed.add_field(name="Account Age", value=f"{account_age_days} days", inline=False)
+
+        now_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        embed.set_footer(text=f"Verification Logger • {now_str}")
+
+        log_sink.send(log_channel, embed)
+
+    return True
+
+class VerifyButtonView(discord.ui.View):
+    def __init__(self, guild_id):
+        super().__init__(timeout=None)
+        self.guild_id = guild_id
+        self.verify_button.custom_id = f"{VERIFY_GUILDS[guild_id]['key']}:verify"
+
+    @discord.ui.button(label="Verify", style=discord.ButtonStyle.green, custom_id="verify")
+    async def verify_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(VerifyModal(self.guild_id))
+
+def views():
+    return [VerifyButtonView(guild_id) for guild_id in VERIFY_GUILDS]
+
+async def send_verify_message(bot, guild_id):
+    settings = VERIFY_GUILDS[guild_id]
+    channel = bot.get_channel(settings["verify_channel_id"])
+    if not channel:
+        return
+
+    embed = discord.Embed(
+        title="Minecraft Account Verification",
+        description=(
+            "To gain access to this server, you need to verify that you own a Minecraft account.\n\n"
+            "➤ **What do I need to do?**\n"
+            "Make sure you've linked your **Discord account** to your Minecraft account **on Hypixel**. To do this:\n"
+            "• Join Hypixel (`mc.hypixel.net`)\n"
+            "• Right-click the **'My Profile'** head (2nd slot in your hotbar)\n"
+            "• Go to **'Social Media'**, and link your Discord there\n\n"
+            "➤ **Not sure how?**\n"
+            f"Check out <#{settings['guide_channel_id']}> for a step-by-step guide.\n\n"
+            "➤ **How does this system work?**\n"
+            "This verification system uses the **official Hypixel API** to check if your Minecraft account is linked to your Discord. You only enter your **Minecraft username** — nothing else.\n\n"
+            "We never ask for passwords or tokens. Everything is handled securely through Hypixel."
+        ),
+        color=discord.Color.green()
+    )
+    embed.set_footer(text=f"Verification System • {settings['name']}")
+
+    await panels.ensure_panel(bot, f"verify_{settings['key']}", channel, embed, VerifyButtonView(guild_id))
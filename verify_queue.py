@@ -0,0 +1,146 @@
+import asyncio
+from collections import OrderedDict
+
+# Verification spends roughly one Hypixel request per attempt. A handful of
+# workers keeps the verify share of the budget busy without letting a burst
+# hit the API all at once.
+WORKERS = 4
+MAX_QUEUE = 100 # interaction tokens last 15 minutes, don't queue past what we can finish
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30 # seconds before an attempt that hit a busy API goes back in the queue
+POSITION_REFRESH = 3 # seconds; dequeues inside this window share one round of position edits
+
+class Job:
+    def __init__(self, key, interaction, work):
+        self.key = key
+        self.interaction = interaction
+        self.work = work # async fn(reply, can_retry) -> True when finished
+        self.attempts = 0
+        self.shown = None # queue position the user was last told
+
+    async def reply(self, content=None, embed=None):
+        # The deferred "thinking" message is the one we keep editing
+        await self.interaction.edit_original_response(content=content, embed=embed)
+
+_pending = OrderedDict() # key -> Job, in queue order
+_running = set() # keys being worked on right now
+_waiting = set() # keys sitting out a retry delay
+_ready = asyncio.Event()
+_workers = []
+_refresher = None
+
+def position(key):
+    for i, pending_key in enumerate(_pending, 1):
+        if pending_key == key:
+            return i
+    return None
+
+def _line_position(key):
+    # Place among the jobs still waiting for a worker, None if an idle worker
+    # is about to pick it up anyway
+    queued = position(key)
+    if queued is None:
+        return None
+    place = queued - (WORKERS - len(_running))
+    return place if place > 0 else None
+
+async def _show_position(job, place):
+    job.shown = place
+    await job.interaction.edit_original_response(
+        content=f"⏳ You're **#{place}** in the verification queue. This message will update with your result."
+    )
+
+def _schedule_refresh():
+    global _refresher
+    if _refresher is None or _refresher.done():
+        _refresher = asyncio.create_task(_refresh_positions())
+
+async def _refresh_positions():
+    await asyncio.sleep(POSITION_REFRESH)
+    for job in list(_pending.values()):
+        place = _line_position(job.key)
+        if place is not None and place != job.shown:
+            try:
+                await _show_position(job, place)
+            except Exception:
+                pass
+
+def _start_workers():
+    _workers[:] = [task for task in _workers if not task.done()]
+    while len(_workers) < WORKERS:
+        _workers.append(asyncio.create_task(_worker()))
+
+async def submit(key, interaction, work):
+    # key identifies one user in one guild; a resubmission while the first
+    # is still queued replaces it instead of taking a second slot
+    if key in _running or key in _waiting:
+        await interaction.edit_original_response(content="⏳ Your previous verification is still being processed. Hang tight!")
+        return
+
+    job = _pending.get(key)
+    if job is not None:
+        try:
+            await job.interaction.edit_original_response(content="Replaced by your newer submission.")
+        except Exception:
+            pass
+        job.interaction = interaction
+        job.work = work
+    else:
+        if len(_pending) >= MAX_QUEUE:
+            await interaction.edit_original_response(content="❌ Verification is very busy right now. Please try again in a few minutes.")
+            return
+        job = _pending[key] = Job(key, interaction, work)
+
+    _start_workers()
+    _ready.set()
+    place = _line_position(key)
+    if place is not None:
+        await _show_position(job, place)
+
+def _requeue(job):
+    _waiting.discard(job.key)
+    if job.key not in _pending:
+        job.shown = None # they were told the APIs are busy, not a position
+        _pending[job.key] = job
+        _ready.set()
+        _schedule_refresh()
+
+async def _worker():
+    while True:
+        while not _pending:
+            _ready.clear()
+            await _ready.wait()
+        key, job = _pending.popitem(last=False)
+        _running.add(key)
+        _schedule_refresh() # everyone behind moved up one
+        job.attempts += 1
+        try:
+            finished = await job.work(job.reply, job.attempts < MAX_ATTEMPTS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"verification for {key} failed:", e)
+            finished = True
+            try:
+                await job.reply(content="❌ Unexpected error occured.", embed=None)
+            except Exception:
+                pass
+        finally:
+            _running.discard(key)
+
+        if not finished:
+            _waiting.add(key)
+            try:
+                await job.reply(content="⏳ The Minecraft APIs are busy right now. You're still in the queue, this message will update on its own.")
+            except Exception:
+                pass
+            asyncio.get_running_loop().call_later(RETRY_DELAY, _requeue, job)
+
+async def stop():
+    tasks = [task for task in _workers if not task.done()]
+    if _refresher is not None and not _refresher.done():
+        tasks.append(_refresher)
+    _workers.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,87 @@
+import bisect
+import discord
+
+# (wins, role id), highest milestone first
+WIN_ROLES = [
+    (50000, '1108326132379558038'),
+    (49000, '1108326080890277938'),
+    (48000, '1108326025840046141'),
+    (47000, '1108325974107504691'),
+    (46000, '1108325917459218503'),
+    (45000, '1108325869002424400'),
+    (44000, '1108325797237882991'),
+    (43000, '1108325743672438854'),
+    (42000, '1108325689515589632'),
+    (41000, '1108325637392977962'),
+    (40000, '1108325585576525885'),
+    (39000, '1108325528194269204'),
+    (38000, '1108325469083934810'),
+    (37000, '1108325409063452692'),
+    (36000, '1108325357909717035'),
+    (35000, '1108325302880452668'),
+    (34000, '1108325253748359218'),
+    (33000, '1108325200682033262'),
+    (32000, '1108325131056578581'),
+    (31000, '1108325079122722886'),
+    (30000, '1108325026110914581'),
+    (29000, '1108324975540195348'),
+    (28000, '1108324906816520232'),
+    (27000, '1108324850835140608'),
+    (26000, '1108324800344113213'),
+    (25000, '1108324746233401375'),
+    (24000, '1108324673244119131'),
+    (23000, '1108324597490790432'),
+    (22000, '1108324541496836107'),
+    (21000, '1108324472387280976'),
+    (20000, '1108324389872742452'),
+    (19000, '1108324333790711838'),
+    (18000, '1108324273891848192'),
+    (17000, '1108324201233920100'),
+    (16000, '1108324112889286666'),
+    (15000, '1108324061618126848'),
+    (14000, '1108323995033542666'),
+    (13000, '1108315273192288337'),
+    (12000, '1108313966901465100'),
+    (11000, '1108309512701616130'),
+    (10000, '1083073967138541589'),
+    (9000, '1083073849215684679'),
+    (8000, '1083073644185534535'),
+    (7000, '1063160742091685939'),
+    (6000, '1026199251434360832'),
+    (5000, '1020364100733247509'),
+    (4000, '1007981455969878036'),
+    (3000, '952452597191704628'),
+    (2000, '937363837303263263'),
+    (1000, '904422116433231953'),
+    (500, '901616321689681971'),
+    (250, '900855705437888583'),
+    (100, '900855548596088944'),
+]
+
+_LADDER = sorted((threshold, int(role_id)) for threshold, role_id in WIN_ROLES)
+_THRESHOLDS = [threshold for threshold, _ in _LADDER]
+ALL_WIN_ROLE_IDS = frozenset(role_id for _, role_id in _LADDER)
+
+def target_win_roles(wins):
+    # Every milestone at or below `wins`
+    return {role_id for _, role_id in _LADDER[:bisect.bisect_right(_THRESHOLDS, wins)]}
+
+def plan_roles(member, wins, add=(), remove=(), prune=True):
+    # Returns the member's full role list after reconciling win roles (plus any
+    # extra role ids to add/remove), and the win role ids added and removed.
+    target = target_win_roles(wins)
+    current = {role.id for role in member.roles if not role.is_default()}
+    current_win = current & ALL_WIN_ROLE_IDS
+
+    added = target - current_win
+    removed = current_win - target if prune else set()
+    final = (current - removed - set(remove)) | added | set(add)
+    return final, added, removed
+
+async def reconcile_win_roles(member, wins, add=(), remove=(), prune=True, reason="Pixel Party win role assignment"):
+    # One member.edit instead of an add_roles call per milestone
+    final, added, removed = plan_roles(member, wins, add, remove, prune)
+    current = {role.id for role in member.roles if not role.is_default()}
+    if final != current:
+        await member.edit(roles=[discord.Object(id=role_id) for role_id in final], reason=reason)
+    return added, removed
@@ -0,0 +1,62 @@
+import asyncio
+import discord
+import hypixel
+import jobs
+import mojang
+import link_store
+import rate_limit
+import state
+from win_roles import reconcile_win_roles
+
+GUILD_ID = 900845277311815701 # PPY
+VERIFIED_ROLE_ID = 903547723918229534
+SHARD_SIZE = 25
+SYNC_INTERVAL = 60
+EDIT_SPACING = 1 # seconds between role edits, keeps us far from Discord's limits
+MIN_HEADROOM = 0.5 # only sync while more than half of the Hypixel window is unspent
+
+CURSOR_KEY = "win_sync_cursor"
+
+def _has_headroom():
+    limiter = rate_limit.hypixel_limiter
+    return limiter.remaining > limiter.limit * MIN_HEADROOM
+
+def _next_shard(guild, cursor):
+    role = guild.get_role(VERIFIED_ROLE_ID)
+    if role is None:
+        return []
+    members = sorted((m for m in role.members if not m.bot), key=lambda m: m.id)
+    shard = [m for m in members if m.id > cursor][:SHARD_SIZE]
+    return shard or members[:SHARD_SIZE] # wrap around once everyone's been visited
+
+async def sync_shard(guild):
+    cursor = state.get(CURSOR_KEY, 0)
+    for member in _next_shard(guild, cursor):
+        if not _has_headroom() or hypixel.breaker.is_open:
+            break
+
+        try:
+            link = link_store.get_link(member.id, guild.id)
+            uuid = link[0] if link else await mojang.get_uuid(member.nick or member.name)
+            if uuid:
+                snapshot = await hypixel.get_snapshot(uuid, priority=rate_limit.PRIORITY_BACKGROUND)
+                if snapshot.exists:
+                    # Wins never go down, so a stale role here means we guessed the
+                    # wrong account from the nickname; only ever add in the background.
+                    added, _ = await reconcile_win_roles(member, snapshot.pixel_party_wins, prune=False, reason="Pixel Party win role sync")
+                    if added:
+                        await asyncio.sleep(EDIT_SPACING)
+        except (mojang.MojangUnavailable, hypixel.HypixelUnavailable):
+            break # retry this member next round
+        except discord.HTTPException as e:
+            print(f"win sync: couldn't update {member.id}:", e)
+
+        state.set(CURSOR_KEY, member.id)
+
+def setup_win_sync(bot):
+    async def sync():
+        guild = bot.get_guild(GUILD_ID)
+        if guild:
+            await sync_shard(guild)
+
+    jobs.every("win_sync", SYNC_INTERVAL, sync, jitter=5, first_delay=SYNC_INTERVAL)